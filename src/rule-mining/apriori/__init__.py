@@ -1,2 +1,7 @@
 from apriori_hashtree import gen_freq_itemsets, gen_rules
 from apriori_tid import gen_freq_itemsets_tid
+from partition import gen_freq_itemsets_partition
+from batch_rules import gen_rules_batch
+from fup import fup_update, IncrementalMiner
+from sampling import gen_freq_itemsets_sampling
+from itemset_cache import ItemsetCache
@@ -4,8 +4,19 @@ Created on Sun March 24 23:40:21 2022
 Title: Apriori Algorithm Implementation In Python 3
 """
 
-from llist import DLinkedList
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from hashtree import HashTree
+from compact_hashtree import CompactHashTree
+from bitmap import BitmapIndex
+
+# transactions of a worker process of the process-pool, set once per worker by _private_init_worker, python list of
+# transactions, or (item_array, offsets) CSR arrays of a TransactionDB
+_worker_transactions = None
+# frequent itemsets (read-only) of a worker process of the rule generation process-pool, inherited on fork or set once
+# per worker by _private_init_rules_worker
+_worker_freq_itemsets = None
 
 
 class Rule:
@@ -64,46 +75,6 @@ def _private_generate_freq_one_itemsets(transactions, n, min_sup=0.6):
     return freq_one_itemsets
 
 
-# list of itemsets
-def _private_can_merge(itemset1, itemset2):
-    """Merges two frequent itemsets of size k to construct a candidate k+1 itemset via F_k x F_k method
-        Parameters
-        -----------
-        itemset1 : python tuple, frequent itemset 1
-        itemset2 : python tuple, frequent itemset 2
-        Returns
-        -----------
-        True if they could be merged to produce a candidate itemset
-        False otherwise
-    """
-    n = len(itemset1)
-    if n != len(itemset2):
-        return False
-    else:
-        for i in range(n):
-            if i < n - 1 and itemset1[i] == itemset2[i]:
-                continue
-            elif i == n - 1 and itemset1[i] != itemset2[i]:
-                return True
-            else:
-                return False
-
-
-def _private_insert_all_except(ls, idx):
-    """
-    Returns a python list, with elements from ls (in-order), except at ls[idx]
-    :param ls: python list
-    :param idx: int
-    :return: python list
-    """
-    output_list = []
-    n = len(ls)
-    for i in range(n):
-        if i != idx:
-            output_list.append(ls[i])
-    return output_list
-
-
 # generate candidate (k+1)-itemset from freq k-itemsets
 # freq_itemsets is a dictionary with keys as tuples and values as their support count
 # k is size of freq_itemsets
@@ -119,50 +90,93 @@ def apriori_gen(freq_itemsets, k):
             size of each frequent itemset
         Returns
         -----------
-        DLinkedList
+        python list
         List of candidate (k+1)-itemsets lists
     """
-    candidate_itemsets = DLinkedList()
     # Candidate Generation Step F_{k} x F_{k} method
-    # Generate candidate item sets of size k+1
-    list_freq_itemsets = list(freq_itemsets.keys())
-    n = len(list_freq_itemsets)
-    for i in range(n):
-        for j in range(i + 1, n):
-            l_itemset1 = list_freq_itemsets[i]
-            l_itemset2 = list_freq_itemsets[j]
-            if _private_can_merge(l_itemset1, l_itemset2):
-                if l_itemset1[k - 1] <= l_itemset2[k - 1]:
-                    candidate_itemset = [item for item in l_itemset1]
-                    candidate_itemset.append(l_itemset2[k - 1])
-                    candidate_itemsets.append(candidate_itemset)
-                else:
-                    candidate_itemset = [item for item in l_itemset2]
-                    candidate_itemset.append(l_itemset1[k - 1])
-                    candidate_itemsets.append(candidate_itemset)
-    # Candidate Pruning Step
-    m = len(candidate_itemsets)
-    to_prune = []
-    for j in range(m):
-        candidate_itemset = candidate_itemsets[j][0]
-        for i in range(k - 1):
-            aux_itemset = _private_insert_all_except(candidate_itemset, i)
-            if tuple(aux_itemset) not in freq_itemsets:
-                # candidate_itemset is infrequent
-                # we'll prune it immediately
-                to_prune.append(j)
-                break
-    for idx in reversed(to_prune):
-        candidate_itemsets.remove(idx)
+    # Two frequent k-itemsets are merged iff they share the same (k-1)-prefix, hence group them by their prefix
+    # and join only inside each group
+    prefix_groups = dict()
+    for itemset in freq_itemsets:
+        prefix = itemset[:k - 1]
+        if prefix in prefix_groups:
+            prefix_groups[prefix].append(itemset[k - 1])
+        else:
+            prefix_groups[prefix] = [itemset[k - 1]]
 
+    candidate_itemsets = []
+    for prefix, last_items in prefix_groups.items():
+        last_items.sort()
+        m = len(last_items)
+        for i in range(m):
+            for j in range(i + 1, m):
+                candidate_itemset = (*prefix, last_items[i], last_items[j])
+                # Candidate Pruning Step
+                # subsets obtained by dropping one of the last two items are the merged frequent itemsets,
+                # rest of the k-subsets are checked against the (hashed) frequent k-itemsets
+                is_infrequent = False
+                for idx in range(k - 1):
+                    if candidate_itemset[:idx] + candidate_itemset[idx + 1:] not in freq_itemsets:
+                        is_infrequent = True
+                        break
+                if not is_infrequent:
+                    candidate_itemsets.append(list(candidate_itemset))
     return candidate_itemsets
 
 
-def gen_freq_itemsets(transactions, min_sup=0.5, max_len=None, max_leaf_size=3, max_children=89):
+def _private_build_hash_tree(candidate_itemsets, k, max_leaf_size, max_children, backend):
+    """
+    Returns a hash tree (of the class selected by backend) containing all the candidate k-itemsets with supp_count 0
+    """
+    hash_tree_class = CompactHashTree if backend == "compact_hashtree" else HashTree
+    hash_tree = hash_tree_class(max_leaf_size=max_leaf_size,
+                                max_children=max_children)
+    for itemset in candidate_itemsets:
+        hash_tree.insert(itemset, 0, k)
+    return hash_tree
+
+
+def _private_init_worker(transactions):
+    global _worker_transactions
+    _worker_transactions = transactions
+
+
+def _private_shard_transactions(start, stop):
+    """
+    Returns transactions start, ..., stop - 1 of _worker_transactions as python lists, CSR arrays are converted only
+    for the shard
+    """
+    if isinstance(_worker_transactions, tuple):
+        item_array, offsets = _worker_transactions
+        base = int(offsets[start])
+        shard_offsets = (offsets[start:stop + 1] - base).tolist()
+        shard = item_array[base:int(offsets[stop])].tolist()
+        return [shard[shard_offsets[i]:shard_offsets[i + 1]] for i in range(stop - start)]
+    return _worker_transactions[start:stop]
+
+
+def _private_count_shard(start, stop, candidate_itemsets, k, max_leaf_size, max_children, backend):
+    """
+    Counts support of candidate k-itemsets in the shard start, ..., stop - 1 of _worker_transactions (runs in a worker
+    process)
+    :return: python list of support counts, aligned with candidate_itemsets
+    """
+    hash_tree = _private_build_hash_tree(candidate_itemsets, k, max_leaf_size, max_children, backend)
+    for t in _private_shard_transactions(start, stop):
+        w = len(t)
+        if w >= k:
+            hash_tree.update_support(t, w, k)
+    supp_counts = dict()
+    hash_tree.all_fitemsets(supp_counts, 0)
+    return [supp_counts[tuple(itemset)] for itemset in candidate_itemsets]
+
+
+def gen_freq_itemsets(transactions, min_sup=0.5, max_len=None, max_leaf_size=3, max_children=89, backend="hashtree",
+                      n_jobs=None):
     """Get frequent itemsets from a transaction basket
         Parameters
         -----------
-        transactions : python dictionary with TID as key and transactions as value
+        transactions : python dictionary with TID as key and transactions as value (or a TransactionDB)
           Set of all transactions in the data-set
 
         min_sup : float (default: 0.5)
@@ -178,6 +192,20 @@ def gen_freq_itemsets(transactions, min_sup=0.5, max_len=None, max_leaf_size=3,
 
         max_children : int (default : 89)
 
+        backend : str (default : "hashtree")
+          Support-counting engine for candidate itemsets
+          "hashtree" : candidates are stored in a Hash-Tree and counted with a scan of the transactions per level
+          "compact_hashtree" : same as "hashtree", with the array-backed CompactHashTree (sparse children, no
+                               per-node blocks, candidates matched in the leaves without building itemsets)
+          "bitmap" : one packed bit-vector is built per frequent item (once), support of each candidate is
+                     counted with vectorized AND and popcount of the bit-vectors of its items
+
+        n_jobs : int (default : None)
+          Number of worker processes used for support-counting with the hash-tree backends, transactions are split
+          into n_jobs shards and candidates of each level are counted for each shard in a separate process, the
+          per-shard support counts are then summed. `None` or 1 counts in the calling process, -1 uses all CPUs.
+          (the "bitmap" backend always counts in the calling process)
+
         Returns
         -----------
         List of Python Dictionary , denoted as freq_itemsets
@@ -186,37 +214,78 @@ def gen_freq_itemsets(transactions, min_sup=0.5, max_len=None, max_leaf_size=3,
                 value: int, supp_count of the itemset
         """
 
+    if backend not in ("hashtree", "compact_hashtree", "bitmap"):
+        raise ValueError(f'Unknown support-counting backend : {backend}')
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
     # list of all freq_itemset
     # freq_itemset[k] gives all frequent k-itemsets
     n = len(transactions)
     k = 0
     # List of all frequent k-itemsets, for each k >= 1, stored in a python dictionary along with support count
     freq_itemsets = [_private_generate_freq_one_itemsets(transactions, n, min_sup)]
-    while True:
-        k += 1
-        if max_len is not None:
-            if k > max_len:
+    bitmap_index = None
+    executor = None
+    shards = None
+    if backend == "bitmap":
+        bitmap_index = BitmapIndex(transactions, [itemset[0] for itemset in freq_itemsets[0]])
+    elif n_jobs is not None and n_jobs > 1:
+        # transactions are sent to each worker only once, shards are then referred to by their boundaries
+        # (CSR arrays of a TransactionDB are sent as they are, and converted to python lists shard by shard)
+        if hasattr(transactions, 'item_array'):
+            worker_transactions = (transactions.item_array, transactions.offsets)
+        else:
+            worker_transactions = list(transactions.values())
+        executor = ProcessPoolExecutor(max_workers=n_jobs,
+                                       initializer=_private_init_worker,
+                                       initargs=(worker_transactions,))
+        shard_size = max(1, -(-n // n_jobs))
+        shards = [(start, min(start + shard_size, n)) for start in range(0, n, shard_size)]
+    try:
+        while True:
+            k += 1
+            if max_len is not None:
+                if k > max_len:
+                    break
+            candidate_itemsets = apriori_gen(freq_itemsets[k - 1], k)
+            # returns a python list of candidate (k+1)-itemsets
+
+            if bitmap_index is not None:
+                # support-count using vertical bitmaps
+                supp_counts = bitmap_index.support_counts(candidate_itemsets, k + 1)
+                freq_kitemsets = {tuple(itemset): int(supp_count)
+                                  for itemset, supp_count in zip(candidate_itemsets, supp_counts)
+                                  if supp_count >= n * min_sup}
+            elif executor is not None and len(candidate_itemsets) > 0:
+                # support-count of each shard using hash tree in a worker process
+                # candidates are sent to each worker once per level
+                futures = [executor.submit(_private_count_shard, start, stop, candidate_itemsets, k + 1,
+                                           max_leaf_size, max_children, backend)
+                           for start, stop in shards]
+                supp_counts = [0] * len(candidate_itemsets)
+                for future in futures:
+                    for i, supp_count in enumerate(future.result()):
+                        supp_counts[i] += supp_count
+                freq_kitemsets = {tuple(itemset): supp_count
+                                  for itemset, supp_count in zip(candidate_itemsets, supp_counts)
+                                  if supp_count >= n * min_sup}
+            else:
+                # support-count using hash tree
+                hash_tree = _private_build_hash_tree(candidate_itemsets, k + 1, max_leaf_size, max_children, backend)
+
+                for _, t in transactions.items():
+                    # (k+1) is the size of candidate (k+1)-itemsets
+                    w = len(t)
+                    if w >= k + 1:
+                        hash_tree.update_support(t, w, k + 1)
+                freq_kitemsets = dict()
+                hash_tree.all_fitemsets(freq_kitemsets, n * min_sup)
+            if len(freq_kitemsets) == 0:
                 break
-        candidate_itemsets = apriori_gen(freq_itemsets[k - 1], k)
-        # returns a DLinkedList of (candidate (k+1)-itemset, supp_count)
-
-        # support-count using hash tree
-        hash_tree = HashTree(max_leaf_size=max_leaf_size,
-                             max_children=max_children)
-
-        for itemset, supp_count in candidate_itemsets:
-            hash_tree.insert(itemset, supp_count, k+1)
-
-        for _, t in transactions.items():
-            # (k+1) is the size of candidate (k+1)-itemsets
-            w = len(t)
-            if w >= k + 1:
-                hash_tree.update_support(t, w, k + 1)
-        freq_kitemsets = dict()
-        hash_tree.all_fitemsets(freq_kitemsets, n * min_sup)
-        if len(freq_kitemsets) == 0:
-            break
-        freq_itemsets.append(freq_kitemsets)
+            freq_itemsets.append(freq_kitemsets)
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
     return freq_itemsets
 
@@ -226,11 +295,11 @@ def ap_genrules(freq_itemsets, k_itemset, k, min_conf, H, m, rules):
     # m = len(H)
     if k > m + 1:
         H = apriori_gen(H, m)
-        # H is a Doubly linked-list of all candidate m+1-itemset consequent, and supp_count : 0
-        # convert H into a dictionary with keys as frozenset, denoting itemsets as lists in H
+        # H is a python list of all candidate m+1-itemset consequent
+        # convert H into a dictionary with keys as tuples, denoting itemsets as lists in H
         # --------------------------- with values as int, denoting support count of corresponding frequent itemset
         _H = dict()
-        for itemset, _ in H:
+        for itemset in H:
             _itemset = tuple(itemset)
             # _itemset is subset of k_itemset and hence must be in freq_itemsets[m]
             _H[_itemset] = freq_itemsets[m][_itemset]
@@ -251,7 +320,47 @@ def ap_genrules(freq_itemsets, k_itemset, k, min_conf, H, m, rules):
         ap_genrules(freq_itemsets, k_itemset, k, min_conf, _H, m+1, rules)
 
 
-def gen_rules(freq_itemsets, min_conf=0.6):
+def _private_gen_rules_itemsets(freq_itemsets, k_itemsets, k, min_conf):
+    """
+    Returns python list of all rules with conf >= min_conf generated from the frequent k-itemsets k_itemsets
+    """
+    rules = []
+    H = dict()  # set of all rule consequent of size 1 from each frequent-itemset from k_itemsets
+    for k_itemset in k_itemsets:
+        # k_itemset is a frequent k-itemset
+        for item in k_itemset:
+            H[(item,)] = freq_itemsets[0][(item,)]
+        ap_genrules(freq_itemsets, k_itemset, k, min_conf, H, 1, rules)
+        H.clear()
+    return rules
+
+
+def _private_freq_itemsets_by_size(freq_itemsets):
+    """
+    Returns python list of dictionaries of frequent itemsets by size, for a python dictionary {itemset: supp_count}
+    (output of fpgrowth's gen_freq_itemsets), any other freq_itemsets (python list of dictionaries, ItemsetTrie)
+    is returned as it is
+    """
+    if not isinstance(freq_itemsets, dict):
+        return freq_itemsets
+    freq_itemsets_by_size = []
+    for itemset, supp_count in freq_itemsets.items():
+        while len(freq_itemsets_by_size) < len(itemset):
+            freq_itemsets_by_size.append(dict())
+        freq_itemsets_by_size[len(itemset) - 1][tuple(sorted(itemset))] = supp_count
+    return freq_itemsets_by_size
+
+
+def _private_init_rules_worker(freq_itemsets):
+    global _worker_freq_itemsets
+    _worker_freq_itemsets = freq_itemsets
+
+
+def _private_gen_rules_chunk(k_itemsets, k, min_conf):
+    return _private_gen_rules_itemsets(_worker_freq_itemsets, k_itemsets, k, min_conf)
+
+
+def gen_rules(freq_itemsets, min_conf=0.6, n_jobs=None, chunk_size=None):
     """
     Generate all rules from given frequent_itemsets list with conf >= min_conf
     Parameters
@@ -260,22 +369,48 @@ def gen_rules(freq_itemsets, min_conf=0.6):
                     freq_itemsets[k] is set of all frequent k-itemsets
                         key : python tuple denoting frequent k-itemsets
                         value : supp_count
+                   or python dictionary {itemset : supp_count} of all frequent itemsets, or an ItemsetTrie
+                   (outputs of fpgrowth's gen_freq_itemsets, gen_freq_itemsets_projected_DB)
     min_conf: python float
         min_conf threshold for the rules
+    n_jobs: int (default : None)
+        Number of worker processes, frequent itemsets of each size are split into chunks and rules of each chunk
+        are generated in a worker process (freq_itemsets is shared read-only with the workers, inherited on fork),
+        rules are returned in the same order as the serial run. `None` or 1 runs in the calling process,
+        -1 uses all CPUs
+    chunk_size: int (default : None)
+        Number of frequent itemsets in each chunk (used only if n_jobs > 1), if `None` each size is split into
+        about 4 chunks per worker
     """
-    k = 1
+    freq_itemsets = _private_freq_itemsets_by_size(freq_itemsets)
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+    if n_jobs is None or n_jobs <= 1:
+        rules = []
+        for k in range(2, len(freq_itemsets) + 1):
+            rules.extend(_private_gen_rules_itemsets(freq_itemsets, freq_itemsets[k - 1], k, min_conf))
+        return rules
+
+    global _worker_freq_itemsets
+    if 'fork' in multiprocessing.get_all_start_methods():
+        # workers inherit freq_itemsets from the address space of this process, nothing is pickled
+        _worker_freq_itemsets = freq_itemsets
+        executor = ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context('fork'))
+    else:
+        executor = ProcessPoolExecutor(max_workers=n_jobs,
+                                       initializer=_private_init_rules_worker,
+                                       initargs=(freq_itemsets,))
     rules = []
-    for freq_itemsets_k in freq_itemsets:
-        # freq_itemsets_k set of all frequent k-itemsets
-        if k == 1:
-            k += 1
-            continue
-        H = dict()  # set of all rule consequent of size 1 from each frequent-itemset from freq_itemsets_k
-        for k_itemset in freq_itemsets_k:
-            # k_itemset is a frequent k-itemset
-            for item in k_itemset:
-                H[(item,)] = freq_itemsets[0][(item,)]
-            ap_genrules(freq_itemsets, k_itemset, k, min_conf, H, 1, rules)
-            H.clear()
-        k += 1
+    try:
+        for k in range(2, len(freq_itemsets) + 1):
+            k_itemsets = list(freq_itemsets[k - 1])
+            size = chunk_size if chunk_size is not None else max(1, -(-len(k_itemsets) // (4 * n_jobs)))
+            chunks = [k_itemsets[start:start + size] for start in range(0, len(k_itemsets), size)]
+            # executor.map yields rules of the chunks in order, as they are done
+            for chunk_rules in executor.map(_private_gen_rules_chunk, chunks,
+                                            [k] * len(chunks), [min_conf] * len(chunks)):
+                rules.extend(chunk_rules)
+    finally:
+        executor.shutdown()
+        _worker_freq_itemsets = None
     return rules
@@ -4,7 +4,8 @@ Created on Sun March 30 18:37:43 2022
 Title: AprioriTID Algorithm Implementation In Python 3
 """
 
-from llist import DLinkedList
+from array import array
+from compact_hashtree import CompactHashTree
 
 
 class Itemset:
@@ -38,12 +39,12 @@ class Itemset:
         return str(list(self.itemset))
 
 
-def _private_generate_freq_one_itemsets(candidate_itemsets_, n, min_sup=0.5):
+def _private_generate_freq_one_itemsets(transactions, n, min_sup=0.5):
     """
     Get frequent 1-itemsets from a transaction basket
         Parameters
         -----------
-        candidate_itemsets_ : python dictionary with TID as key and set of Itemsets as value
+        transactions : python dictionary with TID as key and transactions as value (or a TransactionDB)
           Set of all transactions in the data-set
         n : int
           Number of transactions
@@ -54,145 +55,149 @@ def _private_generate_freq_one_itemsets(candidate_itemsets_, n, min_sup=0.5):
         Returns
         -----------
         A dictionary with
-            keys as frequent 1-itemset which is an Itemset
+            keys as frequent 1-itemset which is a python tuple
             values as their support count
             """
     freq_one_itemsets = dict()
-    for _, items in candidate_itemsets_.items():
-        for item in items:
-            if item in freq_one_itemsets:
-                freq_one_itemsets[item] += 1
+    for _, t in transactions.items():
+        for item in t:
+            s = (item,)
+            if s in freq_one_itemsets:
+                freq_one_itemsets[s] += 1
             else:
-                freq_one_itemsets[item] = 1
-    infrequent_items = []
-    for item, sup_count in freq_one_itemsets.items():
-        if sup_count < n * min_sup:
-            infrequent_items.append(item)
-    for item in infrequent_items:
-        del freq_one_itemsets[item]
-    return freq_one_itemsets
-
-
-def _private_can_merge(itemset1, itemset2):
-    """Merges two frequent itemsets of size k to construct a candidate k+1 itemset via F_k x F_k method
-        Parameters
-        -----------
-        itemset1 : Itemset , frequent itemset 1
-        itemset2 : Itemset , frequent itemset 2
-        Returns
-        -----------
-        True if they could be merged to produce a candidate itemset
-        False otherwise
-    """
-    n = len(itemset1)
-    if n != len(itemset2):
-        return False
-    else:
-        for i in range(n):
-            if i < n - 1 and itemset1[i] == itemset2[i]:
-                continue
-            elif i == n - 1 and itemset1[i] != itemset2[i]:
-                return True
-            else:
-                return False
-
-
-def _private_insert_all_except(ls, idx):
-    """
-    Returns a python list, with elements from ls (in-order), except at ls[idx]
-    :param ls: any python sequence
-    :param idx: int
-    :return: python list
-    """
-    output_list = []
-    n = len(ls)
-    for i in range(n):
-        if i != idx:
-            output_list.append(ls[i])
-    return output_list
+                freq_one_itemsets[s] = 1
+    # IDs of frequent 1-itemsets are assigned in increasing order of items
+    return {itemset: supp_count for itemset, supp_count in sorted(freq_one_itemsets.items())
+            if supp_count >= n * min_sup}
 
 
 # generate candidate (k+1)-itemset from freq k-itemsets
-# freq_itemsets is a dictionary with keys as Itemset and values as their support count (int)
+# freq_itemsets is a python list of tuples, ID of a frequent k-itemset is its index in the list
 # k is size of freq_itemsets
 def apriori_gen(freq_itemsets, k):
     """
     Generate candidate (k+1)-itemsets from frequent k-itemsets
         Parameters
         -----------
-        freq_itemsets : python dictionary
-            keys as Itemset corresponding to frequent k-itemsets
-            values as their support count (int)
+        freq_itemsets : python list
+            python tuples corresponding to frequent k-itemsets, ID of an itemset is its index in the list
         k : int
             size of each frequent itemset
         Returns
         -----------
-        DLinkedList
-        List of candidate (k+1)-Itemset DLinkedList, with supp_count = 0
+        (candidate_itemsets, generators, extensions)
+        candidate_itemsets : python list of candidate (k+1)-itemsets (python tuples), ID of a candidate is its index
+        generators : array of IDs, generators[c] is ID of the later of the two frequent itemsets whose join
+                     generated candidate c
+        extensions : python list, extensions[i] is list of IDs of the candidates that are extensions of
+                     frequent itemset i (i is the former of the two frequent itemsets whose join generated them)
     """
-    candidate_itemsets = DLinkedList()
     # Candidate Generation Step F_{k} x F_{k} method
-    # Generate candidate item sets of size k+1
-    list_freq_itemsets = list(freq_itemsets.keys())
-    n = len(list_freq_itemsets)
-    for i in range(n):
-        for j in range(i + 1, n):
-            l_itemset1 = list_freq_itemsets[i]
-            l_itemset2 = list_freq_itemsets[j]
-            if _private_can_merge(l_itemset1, l_itemset2):
-                if l_itemset1[k - 1] <= l_itemset2[k - 1]:
-                    candidate_itemset = [item for item in l_itemset1]
-                    candidate_itemset.append(l_itemset2[k - 1])
-                    candidate_itemset = Itemset(generators=l_itemset2,
-                                                extensions=None,
-                                                itemset=tuple(candidate_itemset))
-                    candidate_itemsets.append(candidate_itemset)
-                    l_itemset1.extensions.append(candidate_itemset)
-                else:
-                    candidate_itemset = [item for item in l_itemset2]
-                    candidate_itemset.append(l_itemset1[k - 1])
-                    candidate_itemset = Itemset(generators=l_itemset1,
-                                                extensions=None,
-                                                itemset=tuple(candidate_itemset))
-                    candidate_itemsets.append(candidate_itemset)
-                    l_itemset2.extensions.append(candidate_itemset)
-    # Candidate Pruning Step
-    m = len(candidate_itemsets)
-    to_prune = []
-    for j in range(m):
-        candidate_itemset = candidate_itemsets[j][0]   # An Itemset
-        for i in range(k - 1):
-            aux_itemset = _private_insert_all_except(candidate_itemset.itemset, i)
-            if Itemset(itemset=tuple(aux_itemset)) not in freq_itemsets:
-                # candidate_itemset is infrequent
-                # we'll prune it immediately
-                to_prune.append(j)
-                break
-    for idx in reversed(to_prune):
-        candidate_itemsets.remove(idx)
-    return candidate_itemsets
-
-
-def _private_set_itemsets(transactions):
-    dict_items = dict()
-    candidate_itemsets = {TID: set() for TID in transactions}
-    for TID, itemset in transactions.items():
-        for item in itemset:
-            if item not in dict_items:
-                item_ = Itemset(itemset=(item,))
-                dict_items[item] = item_
-                candidate_itemsets[TID].add(item_)
-            else:
-                candidate_itemsets[TID].add(dict_items[item])
-    return candidate_itemsets
+    # Two frequent k-itemsets are merged iff they share the same (k-1)-prefix, hence group them by their prefix
+    # and join only inside each group
+    prefix_groups = dict()
+    for idx, itemset in enumerate(freq_itemsets):
+        prefix = itemset[:k - 1]
+        if prefix in prefix_groups:
+            prefix_groups[prefix].append(idx)
+        else:
+            prefix_groups[prefix] = [idx]
+    # hashed set of frequent k-itemsets for O(1) subset checks
+    freq_tuples = set(freq_itemsets)
+
+    candidate_itemsets = []
+    generators = array('l')
+    extensions = [[] for _ in range(len(freq_itemsets))]
+    for group in prefix_groups.values():
+        group.sort(key=lambda idx: freq_itemsets[idx][k - 1])
+        m = len(group)
+        for i in range(m):
+            for j in range(i + 1, m):
+                candidate_itemset = freq_itemsets[group[i]] + (freq_itemsets[group[j]][k - 1],)
+                # Candidate Pruning Step
+                # subsets obtained by dropping one of the last two items are the generators
+                # rest of the k-subsets are checked against the frequent k-itemsets
+                is_infrequent = False
+                for idx in range(k - 1):
+                    if candidate_itemset[:idx] + candidate_itemset[idx + 1:] not in freq_tuples:
+                        is_infrequent = True
+                        break
+                if is_infrequent:
+                    continue
+                extensions[group[i]].append(len(candidate_itemsets))
+                generators.append(group[j])
+                candidate_itemsets.append(candidate_itemset)
+    return candidate_itemsets, generators, extensions
+
+
+def _private_count_tid(tid_db, generators, extensions, n_candidates):
+    """
+    Support counting pass of AprioriTID over C̄_k
+    :param tid_db: (array of IDs, array of offsets), C̄_k in CSR layout
+    :return: (array of support counts of the candidates, C̄_{k+1} in CSR layout, with IDs of the candidates)
+    """
+    tid_ids, tid_offsets = tid_db
+    supp_counts = array('q', [0]) * n_candidates
+    new_ids = array('l')
+    new_offsets = array('l', [0])
+    for r in range(len(tid_offsets) - 1):
+        row = tid_ids[tid_offsets[r]:tid_offsets[r + 1]]
+        set_of_ids = set(row)
+        for idx in row:
+            # these extensions are IDs of the candidates generated from frequent itemset idx
+            for cid in extensions[idx]:
+                if generators[cid] in set_of_ids:
+                    supp_counts[cid] += 1
+                    new_ids.append(cid)
+        if len(new_ids) > new_offsets[-1]:
+            new_offsets.append(len(new_ids))
+    return supp_counts, (new_ids, new_offsets)
+
+
+def _private_count_hash_tree(transactions, candidate_itemsets, k, build_tid_db, max_leaf_size, max_children):
+    """
+    Support counting pass of Apriori over the transactions (using CompactHashTree)
+    :param build_tid_db: bool, if True C̄_k is built in the same pass
+    :return: (array of support counts of the candidates, C̄_k in CSR layout with IDs of the candidates or None)
+    """
+    hash_tree = CompactHashTree(max_leaf_size=max_leaf_size, max_children=max_children)
+    for itemset in candidate_itemsets:
+        hash_tree.insert(itemset, 0, k)
+    new_ids = array('l') if build_tid_db else None
+    new_offsets = array('l', [0])
+    for _, t in transactions.items():
+        w = len(t)
+        if w >= k:
+            hash_tree.update_support(t, w, k, new_ids)
+            if build_tid_db and len(new_ids) > new_offsets[-1]:
+                new_offsets.append(len(new_ids))
+    return hash_tree.supp_counts, ((new_ids, new_offsets) if build_tid_db else None)
+
+
+def _private_set_itemsets(transactions, item_ids):
+    """
+    Returns C̄_1 in CSR layout, i.e. IDs of frequent 1-itemsets present in each of the transactions
+    :param item_ids: python dictionary, item (key) and ID of the frequent 1-itemset (value)
+    """
+    tid_ids = array('l')
+    tid_offsets = array('l', [0])
+    for _, t in transactions.items():
+        for item in t:
+            idx = item_ids.get(item)
+            if idx is not None:
+                tid_ids.append(idx)
+        if len(tid_ids) > tid_offsets[-1]:
+            tid_offsets.append(len(tid_ids))
+    return tid_ids, tid_offsets
 
 
-def gen_freq_itemsets_tid(transactions, min_sup=0.5, max_len=None):
+def gen_freq_itemsets_tid(transactions, min_sup=0.5, max_len=None, hybrid=False, max_tid_entries=1 << 22,
+                          max_leaf_size=3, max_children=89):
     """
     Get frequent itemsets from a transaction basket
         Parameters
         -----------
-        transactions : python dictionary with TID as key and transactions as value
+        transactions : python dictionary with TID as key and transactions as value (or a TransactionDB)
           Set of all transactions in the data-set
 
         min_sup : float (default: 0.5)
@@ -204,6 +209,20 @@ def gen_freq_itemsets_tid(transactions, min_sup=0.5, max_len=None):
           Maximum length of the item-sets generated. If `None` (default) all
           possible item-sets lengths (under the apriori condition) are evaluated.
 
+        hybrid : bool (default: False)
+          If True, AprioriHybrid algorithm is used, i.e. passes of Apriori (hash-tree support-counting over the
+          transactions) are done while the estimated size of C̄_k is more than max_tid_entries, then the algorithm
+          switches to AprioriTID for the remaining passes
+
+        max_tid_entries : int (default: 4194304)
+          Max number of entries (IDs) of C̄_k that can be held in memory (used only if hybrid is True)
+
+        max_leaf_size : int (default : 3)
+          Max number of candidates stored in a leaf of the hash tree used in the passes over the transactions
+
+        max_children : int (default : 89)
+          Max number of children of an internal node of the hash tree used in the passes over the transactions
+
         Returns
         -----------
         List of Python Dictionary , denoted as freq_itemsets
@@ -214,48 +233,66 @@ def gen_freq_itemsets_tid(transactions, min_sup=0.5, max_len=None):
     # list of all freq_itemset
     # freq_itemset[k] gives all frequent k-itemsets
     n = len(transactions)
-    k = 0
-    candidate_itemsets_ = _private_set_itemsets(transactions)
-    # List of all frequent k-itemsets, for each k >= 1, stored in a python dictionary along with support count
-    freq_itemsets = [_private_generate_freq_one_itemsets(candidate_itemsets_, n, min_sup)]
+    k = 1
+    freq_one_itemsets = _private_generate_freq_one_itemsets(transactions, n, min_sup)
+    # python list of frequent k-itemsets, ID of a frequent k-itemset is its index in the list
+    freq_kitemsets = list(freq_one_itemsets.keys())
+    freq_itemsets = [{Itemset(itemset=itemset): supp_count for itemset, supp_count in freq_one_itemsets.items()}]
+
+    # C̄_k is stored in CSR layout as pair of arrays (tid_ids, tid_offsets), tid_ids[tid_offsets[r]:tid_offsets[r+1]]
+    # are IDs of the frequent k-itemsets present in r-th transaction (transactions without any are dropped)
+    tid_db = None
+    # size of C̄_k estimated as in AprioriHybrid, sum of support counts of the candidates + number of transactions
+    estimated_size = sum(freq_one_itemsets.values()) + n
+    if not hybrid:
+        tid_db = _private_set_itemsets(transactions, {itemset[0]: idx for idx, itemset in enumerate(freq_kitemsets)})
+
     while True:
-        k += 1
         if max_len is not None:
-            if k > max_len:
+            if k + 1 > max_len:
                 break
-        # candidate k+1-itemsets
-        candidate_itemsets = apriori_gen(freq_itemsets[k - 1], k)
-        candidate_itemsets__ = dict()
-        supp_counts_candidate = dict()
-
-        for TID in candidate_itemsets_:
-            candidate_itemsets_t = set()
-            set_of_itemsets = candidate_itemsets_[TID]
-            for candidate_k_1 in set_of_itemsets:
-                if candidate_k_1.extensions is None:
-                    continue
-                # these extensions point to candidate itemsets in candidate_itemsets DLinkedList
-                # candidate_k_1.extensions is not None
-                for candidate_k in candidate_k_1.extensions:
-                    # candidate_k.generators is not None as it is extension of candidate_k_1
-                    id = candidate_k.generators
-                    if id in set_of_itemsets:
-                        candidate_itemsets_t.add(candidate_k)
-
-            for candidate in candidate_itemsets_t:
-                if candidate not in supp_counts_candidate:
-                    supp_counts_candidate[candidate] = 1
-                else:
-                    supp_counts_candidate[candidate] += 1
-            candidate_itemsets__[TID] = candidate_itemsets_t
-
-        freq_kitemsets = {itemset: supp_counts_candidate[itemset] for itemset, _ in candidate_itemsets
-                          if itemset in supp_counts_candidate and supp_counts_candidate[itemset] >= min_sup * n}
+        # candidate (k+1)-itemsets
+        candidate_itemsets, generators, extensions = apriori_gen(freq_kitemsets, k)
+        if len(candidate_itemsets) == 0:
+            break
+        if tid_db is not None:
+            supp_counts, candidate_tid_db = _private_count_tid(tid_db, generators, extensions,
+                                                               len(candidate_itemsets))
+        else:
+            # switch to AprioriTID once C̄_{k+1} is expected to fit in memory, and number of frequent itemsets is
+            # decreasing
+            switch = estimated_size <= max_tid_entries and \
+                (k == 1 or len(freq_kitemsets) < len(freq_itemsets[k - 2]))
+            supp_counts, candidate_tid_db = _private_count_hash_tree(transactions, candidate_itemsets, k + 1, switch,
+                                                                     max_leaf_size, max_children)
+            estimated_size = sum(supp_counts) + n
+
+        # new_id[c] is ID of the frequent (k+1)-itemset for candidate c, -1 for infrequent candidates
+        new_id = array('l', [-1]) * len(candidate_itemsets)
+        freq_kitemsets = []
+        freq_kitemsets_counts = dict()
+        for cid, supp_count in enumerate(supp_counts):
+            if supp_count >= min_sup * n:
+                new_id[cid] = len(freq_kitemsets)
+                freq_kitemsets.append(candidate_itemsets[cid])
+                freq_kitemsets_counts[Itemset(itemset=candidate_itemsets[cid])] = supp_count
         if len(freq_kitemsets) == 0:
             break
-        freq_itemsets.append(freq_kitemsets)
-        candidate_itemsets_.clear()
-        supp_counts_candidate.clear()
-        candidate_itemsets_ = candidate_itemsets__
+        freq_itemsets.append(freq_kitemsets_counts)
+        k += 1
+
+        if candidate_tid_db is not None:
+            # C̄_k retains only IDs of the frequent k-itemsets
+            candidate_ids, candidate_offsets = candidate_tid_db
+            tid_ids = array('l')
+            tid_offsets = array('l', [0])
+            for r in range(len(candidate_offsets) - 1):
+                for cid in candidate_ids[candidate_offsets[r]:candidate_offsets[r + 1]]:
+                    idx = new_id[cid]
+                    if idx >= 0:
+                        tid_ids.append(idx)
+                if len(tid_ids) > tid_offsets[-1]:
+                    tid_offsets.append(len(tid_ids))
+            tid_db = (tid_ids, tid_offsets)
 
     return freq_itemsets
@@ -0,0 +1,169 @@
+"""
+Vectorized (batch) Rule Generation with interest measures, using NumPy
+All frequent itemsets of one size are processed together, consequents are enumerated as bit-masks over the positions
+of the items in the itemsets and the measures of all the rules of a mask are computed at once
+"""
+
+import numpy as np
+from apriori_hashtree import _private_freq_itemsets_by_size
+
+# random odd multipliers for hashing rows of item ids (arithmetic wraps around modulo 2^64)
+_HASH_MULTIPLIERS = np.random.RandomState(7).randint(1, 1 << 62, size=64, dtype=np.int64).astype(np.uint64) | 1
+
+
+def _private_hash_rows(rows):
+    """
+    Returns uint64 hash of every row of a 2d int array
+    """
+    h = np.zeros((rows.shape[0],), dtype=np.uint64)
+    for i in range(rows.shape[1]):
+        h += (rows[:, i].astype(np.uint64) + np.uint64(1)) * _HASH_MULTIPLIERS[i % 64]
+    return h
+
+
+class _SupportLookup:
+    """
+    Vectorized look-up of support counts of the frequent itemsets of one size
+    """
+
+    def __init__(self, rows, supp_counts, freq_itemsets_k):
+        self.rows = rows
+        self.supp_counts = supp_counts
+        self.freq_itemsets_k = freq_itemsets_k
+        hashes = _private_hash_rows(rows)
+        self.order = np.argsort(hashes, kind='stable')
+        self.hashes = hashes[self.order]
+
+    def lookup(self, rows, decode):
+        """
+        Returns support counts of the itemsets given as rows of item ids (all of them must be frequent)
+        """
+        hashes = _private_hash_rows(rows)
+        pos = np.searchsorted(self.hashes, hashes)
+        pos[pos == len(self.hashes)] = 0
+        idx = self.order[pos]
+        found = (self.hashes[pos] == hashes) & np.all(self.rows[idx] == rows, axis=1)
+        supp_counts = self.supp_counts[idx]
+        # hash collisions (very rare) are resolved with the python dictionary
+        for r in np.nonzero(~found)[0]:
+            supp_counts[r] = self.freq_itemsets_k[tuple(decode[rows[r]].tolist())]
+        return supp_counts
+
+
+def _private_masks_by_size(k):
+    """
+    Returns python list, masks[c] is python list of all bit-masks over k positions with c bits set (0 < c < k)
+    """
+    masks = [[] for _ in range(k)]
+    for mask in range(1, (1 << k) - 1):
+        masks[bin(mask).count('1')].append(mask)
+    return masks
+
+
+def _private_to_table(columns):
+    """
+    Converts the columns (python lists of tuples / of numpy arrays) into numpy arrays
+    """
+    table = dict()
+    for name, column in columns.items():
+        if name in ('antecedent', 'consequent'):
+            table[name] = np.empty((len(column),), dtype=object)
+            for i, itemset in enumerate(column):
+                table[name][i] = itemset
+        else:
+            table[name] = np.concatenate(column) if column else np.zeros((0,), dtype=float)
+    return table
+
+
+def gen_rules_batch(freq_itemsets, n_transactions, min_conf=0.6):
+    """
+    Generate all rules from given frequent_itemsets list with conf >= min_conf, along with their interest measures
+    Parameters
+    -----------------------
+    freq_itemsets: python list of dictionaries
+                    freq_itemsets[k] is set of all frequent k-itemsets
+                        key : python tuple denoting frequent k-itemsets
+                        value : supp_count
+                   or python dictionary {itemset : supp_count} of all frequent itemsets, or an ItemsetTrie
+    n_transactions: int
+        number of transactions in the data-set that freq_itemsets were mined from
+    min_conf: python float
+        min_conf threshold for the rules
+    Returns
+    -----------------------
+    python dictionary (columnar table of rules), each value is a numpy array with one entry per rule
+        'antecedent' : python tuples (object array)
+        'consequent' : python tuples (object array)
+        'support' : supp(A u C) = supp_count(A u C) / n_transactions
+        'confidence' : supp(A u C) / supp(A)
+        'lift' : conf(A -> C) / supp(C)
+        'leverage' : supp(A u C) - supp(A) * supp(C)
+        'conviction' : (1 - supp(C)) / (1 - conf(A -> C)), inf for conf = 1
+    """
+    freq_itemsets = _private_freq_itemsets_by_size(freq_itemsets)
+    columns = {name: [] for name in ('antecedent', 'consequent', 'support', 'confidence', 'lift', 'leverage',
+                                     'conviction')}
+    if len(freq_itemsets) == 0:
+        return _private_to_table(columns)
+
+    # dense ids of the items, all the items of frequent itemsets are frequent 1-itemsets
+    decode = np.empty((len(freq_itemsets[0]),), dtype=object)
+    decode[:] = sorted(itemset[0] for itemset in freq_itemsets[0])
+    encode = {item: idx for idx, item in enumerate(decode)}
+
+    levels = []
+    for freq_itemsets_k in freq_itemsets:
+        rows = np.array([sorted(encode[item] for item in itemset) for itemset in freq_itemsets_k], dtype=np.int64)
+        rows = rows.reshape(len(freq_itemsets_k), len(levels) + 1)
+        supp_counts = np.array(list(freq_itemsets_k.values()), dtype=np.int64)
+        levels.append((rows, supp_counts, _SupportLookup(rows, supp_counts, freq_itemsets_k)))
+
+    n = float(n_transactions)
+    for k in range(2, len(freq_itemsets) + 1):
+        rows, supp_counts, _ = levels[k - 1]
+        if len(rows) == 0:
+            continue
+        positions = np.arange(k)
+        # passed[mask] : boolean array, True for itemsets whose rule with consequent mask has conf >= min_conf
+        passed = dict()
+        for c, masks in enumerate(_private_masks_by_size(k)):
+            for mask in masks:
+                if c == 1:
+                    idx = np.arange(len(rows))
+                else:
+                    # confidence is anti-monotone in the consequent, hence consequent mask is considered only for
+                    # itemsets where all the consequents with one item less have passed
+                    valid = np.ones((len(rows),), dtype=bool)
+                    for bit in positions[(mask >> positions) & 1 == 1]:
+                        valid &= passed[mask ^ (1 << bit)]
+                    idx = np.nonzero(valid)[0]
+                passed[mask] = np.zeros((len(rows),), dtype=bool)
+                if len(idx) == 0:
+                    continue
+                in_consequent = (mask >> positions) & 1 == 1
+                antecedent_rows = rows[idx][:, ~in_consequent]
+                consequent_rows = rows[idx][:, in_consequent]
+                supp_count = supp_counts[idx]
+                supp_count_a = levels[k - c - 1][2].lookup(antecedent_rows, decode)
+                confidence = supp_count / supp_count_a
+                keep = confidence >= min_conf
+                passed[mask][idx[keep]] = True
+                if not np.any(keep):
+                    continue
+                antecedent_rows = antecedent_rows[keep]
+                consequent_rows = consequent_rows[keep]
+                confidence = confidence[keep]
+                support = supp_count[keep] / n
+                support_a = supp_count_a[keep] / n
+                support_c = levels[c - 1][2].lookup(consequent_rows, decode) / n
+                conviction = np.divide(1 - support_c, 1 - confidence, out=np.full_like(confidence, np.inf),
+                                       where=confidence < 1)
+                columns['antecedent'].extend(map(tuple, decode[antecedent_rows].tolist()))
+                columns['consequent'].extend(map(tuple, decode[consequent_rows].tolist()))
+                columns['support'].append(support)
+                columns['confidence'].append(confidence)
+                columns['lift'].append(confidence / support_c)
+                columns['leverage'].append(support - support_a * support_c)
+                columns['conviction'].append(conviction)
+
+    return _private_to_table(columns)
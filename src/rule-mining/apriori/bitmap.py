@@ -0,0 +1,101 @@
+"""
+Vertical Bitmap representation of the transaction database for support-counting in Apriori-Algorithm
+"""
+
+import numpy as np
+
+# number of set bits for every possible byte value
+_POPCOUNT_TABLE = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+
+
+def _private_popcount(acc, out):
+    """
+    Stores number of set bits of every byte of acc into out (uint8 array of the same shape), no other temporary
+    """
+    if hasattr(np, 'bitwise_count'):
+        # numpy >= 2.0
+        np.bitwise_count(acc, out=out)
+    else:
+        np.take(_POPCOUNT_TABLE, acc, out=out, mode='clip')
+    return out
+
+
+class BitmapIndex:
+    """
+    Class for Vertical Bitmap Index, stores one packed bit-vector per (frequent) item
+    bit j of the bit-vector of an item is set iff the item occurs in the j-th transaction
+    """
+
+    def __init__(self, transactions, items, max_block_bytes=1 << 26, count_items=False):
+        """
+        Builds the packed bit-vectors of items in a single scan of the transactions
+        :param transactions: python dictionary with TID as key and transactions as value
+        :param items: iterable of item labels, only these items get a bit-vector (generally frequent items)
+        :param max_block_bytes: int, upper bound on size (in bytes) of the intermediate bitmaps built while
+                                counting a batch of candidates (the AND-ed block and one scratch block)
+        :param count_items: bool, if True support counts of all the items (indexed or not) are counted in the same
+                            scan, into self.item_supp_counts (python dictionary), otherwise it is None
+        """
+        self.item_index = {item: idx for idx, item in enumerate(items)}
+        self.n_transactions = len(transactions)
+        self.n_bytes = (self.n_transactions + 7) // 8
+        self.max_block_bytes = max_block_bytes
+        item_supp_counts = dict() if count_items else None
+        rows = []
+        cols = []
+        for j, (_, t) in enumerate(transactions.items()):
+            for item in t:
+                if item_supp_counts is not None:
+                    item_supp_counts[item] = item_supp_counts.get(item, 0) + 1
+                idx = self.item_index.get(item)
+                if idx is not None:
+                    rows.append(idx)
+                    cols.append(j)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        self.bits = np.zeros((len(self.item_index), self.n_bytes), dtype=np.uint8)
+        # most significant bit first, same layout as np.packbits
+        masks = np.left_shift(1, 7 - (cols & 7)).astype(np.uint8)
+        np.bitwise_or.at(self.bits, (rows, cols >> 3), masks)
+        self.item_supp_counts = item_supp_counts
+
+    def support_count(self, itemset):
+        """
+        Returns support count of a single itemset
+        :param itemset: any python sequence of items (all items must be indexed)
+        :return: int
+        """
+        acc = self.bits[self.item_index[itemset[0]]].copy()
+        for item in itemset[1:]:
+            np.bitwise_and(acc, self.bits[self.item_index[item]], out=acc)
+        return int(_private_popcount(acc, np.empty_like(acc)).sum(dtype=np.int64))
+
+    def support_counts(self, candidate_itemsets, k):
+        """
+        Returns support counts of a batch of candidate k-itemsets using vectorized AND and popcount
+        :param candidate_itemsets: python list of candidate k-itemsets (any python sequence of items)
+        :param k: int, size of each candidate itemset
+        :return: numpy array of support counts, aligned with candidate_itemsets
+        """
+        m = len(candidate_itemsets)
+        counts = np.zeros((m,), dtype=np.int64)
+        if m == 0:
+            return counts
+        item_index = self.item_index
+        candidate_rows = np.fromiter((item_index[item] for itemset in candidate_itemsets for item in itemset),
+                                     dtype=np.int64, count=m * k).reshape(m, k)
+        # the AND-ed block and a scratch block (rows of an item, then popcounts) together fit in max_block_bytes
+        # (indices are always valid, mode='clip' lets np.take write into out without an internal copy)
+        block_size = max(1, self.max_block_bytes // max(1, 2 * self.n_bytes))
+        acc_buffer = np.empty((min(block_size, m), self.n_bytes), dtype=np.uint8)
+        scratch_buffer = np.empty_like(acc_buffer)
+        for start in range(0, m, block_size):
+            block = candidate_rows[start:start + block_size]
+            acc = acc_buffer[:len(block)]
+            scratch = scratch_buffer[:len(block)]
+            np.take(self.bits, block[:, 0], axis=0, out=acc, mode='clip')
+            for i in range(1, k):
+                np.take(self.bits, block[:, i], axis=0, out=scratch, mode='clip')
+                np.bitwise_and(acc, scratch, out=acc)
+            counts[start:start + len(block)] = _private_popcount(acc, scratch).sum(axis=1, dtype=np.int64)
+        return counts
@@ -0,0 +1,161 @@
+"""
+Compact (Array-Backed) Hash-Tree Data Structure Implementation In Python 3
+Drop-in replacement of hashtree.HashTree, nodes, candidates and their support counters are stored in flat typed arrays,
+children of internal nodes in a single sparse hashed table
+"""
+
+from array import array
+from hashtree import IllegalOperationException
+
+# marks an absent child / end of a leaf chain
+_NIL = -1
+
+
+class CompactHashTree:
+
+    def __init__(self, max_leaf_size, max_children):
+        """
+        Creates an empty compact hash tree with specified number of max_leaf_size, max_children
+        :param max_leaf_size: int , max number of values stored in each leaf node
+        :param max_children: int , max number of children associated with each hash tree internal node
+        """
+        self.max_leaf_size = max_leaf_size
+        self.max_children = max_children
+        # Node arrays (indexed by node id)
+        # node_is_leaf[node] : 1 for a leaf node, 0 for an internal node
+        # node_first[node] : first candidate id in the chain of candidates of a leaf node
+        # node_size[node] : number of candidates stored in a leaf node
+        self.node_is_leaf = array('b')
+        self.node_first = array('l')
+        self.node_size = array('l')
+        # sparse children of all internal nodes, node * max_children + bucket (key) and child node id (value),
+        # only the buckets actually used take memory
+        self.children = dict()
+        # Candidate arrays (indexed by candidate id)
+        # items[k * cid: k * (cid + 1)] is the candidate itemset with id cid, candidates of a leaf are chained
+        # through next_in_leaf, and are matched against the transaction in place (no itemset is ever built)
+        self.k = None
+        self.items = array('q')
+        self.supp_counts = array('q')
+        self.next_in_leaf = array('l')
+        # Root node is never a leaf
+        self.root = self._new_node(is_leaf=False)
+
+    def _new_node(self, is_leaf=True):
+        node = len(self.node_is_leaf)
+        self.node_is_leaf.append(1 if is_leaf else 0)
+        self.node_first.append(_NIL)
+        self.node_size.append(0)
+        return node
+
+    def _push_candidate(self, node, cid):
+        self.next_in_leaf[cid] = self.node_first[node]
+        self.node_first[node] = cid
+        self.node_size[node] += 1
+
+    def _split_leaf(self, node, level):
+        if not self.node_is_leaf[node]:
+            raise IllegalOperationException('Cannot split an internal node in a Hash Tree')
+        self.node_is_leaf[node] = 0
+        base = node * self.max_children
+        children = self.children
+        cid = self.node_first[node]
+        self.node_first[node] = _NIL
+        self.node_size[node] = 0
+        k = self.k
+        while cid != _NIL:
+            next_cid = self.next_in_leaf[cid]
+            key = base + self.items[k * cid + level] % self.max_children
+            child = children.get(key)
+            if child is None:
+                child = children[key] = self._new_node()
+            self._push_candidate(child, cid)
+            cid = next_cid
+
+    # itemset is a python sequence, and its supp_count
+    def insert(self, itemset, supp_count, max_depth):
+        k = len(itemset)
+        if self.k is None:
+            self.k = k
+        elif self.k != k:
+            raise IllegalOperationException(f'Cannot insert a {k}-itemset into a hash tree of {self.k}-itemsets')
+        cid = len(self.supp_counts)
+        self.items.extend(itemset)
+        self.supp_counts.append(supp_count)
+        self.next_in_leaf.append(_NIL)
+
+        children = self.children
+        curr_node = self.root
+        for i in range(k):
+            key = curr_node * self.max_children + itemset[i] % self.max_children
+            child = children.get(key)
+            if child is None:
+                # whenever a new node is constructed it is always considered to be a leaf node
+                child = children[key] = self._new_node()
+                self._push_candidate(child, cid)
+                break
+            elif self.node_is_leaf[child]:
+                if self.node_size[child] < self.max_leaf_size or i + 1 >= max_depth:
+                    self._push_candidate(child, cid)
+                    break
+                self._split_leaf(child, i + 1)
+                # now child is no longer a leaf node and instead is an internal node
+            curr_node = child
+
+    def _update_support(self, node, transaction, items_in_t, start, w, prefix, depth, k, matched):
+        # prefix[:depth] holds the items hashed on the path from the root to node, items_in_t is the set of items of
+        # the (sorted) transaction
+        # ids of the candidates contained in the transaction are appended to matched (if it is not None)
+        if self.node_is_leaf[node]:
+            items = self.items
+            supp_counts = self.supp_counts
+            next_in_leaf = self.next_in_leaf
+            cid = self.node_first[node]
+            while cid != _NIL:
+                offset = k * cid
+                # candidate must start with the hashed prefix exactly (so that it is counted on a single path), its
+                # other items are larger than prefix[depth - 1], hence they occur in transaction[start:] if at all
+                j = 0
+                while j < depth and items[offset + j] == prefix[j]:
+                    j += 1
+                if j == depth:
+                    while j < k and items[offset + j] in items_in_t:
+                        j += 1
+                    if j == k:
+                        supp_counts[cid] += 1
+                        if matched is not None:
+                            matched.append(cid)
+                cid = next_in_leaf[cid]
+        else:
+            children = self.children
+            max_children = self.max_children
+            base = node * max_children
+            for i in range(start, w - (k - depth) + 1):
+                item = transaction[i]
+                child = children.get(base + item % max_children)
+                if child is not None:
+                    prefix[depth] = item
+                    self._update_support(child, transaction, items_in_t, i + 1, w, prefix, depth + 1, k, matched)
+
+    # Update support count of candidate k-itemsets
+    # transaction is a python list containing all the transactions
+    # if matched (python list) is given, ids (insertion order) of all the candidates contained in transaction are
+    # appended to it
+    def update_support(self, transaction, w, k, matched=None):
+        if w < k:
+            raise IllegalOperationException(f'Cannot update support count of candidate {k}-itemsets if size of '
+                                            f'transaction-set : {w} is less than {k}')
+        self._update_support(self.root, transaction, set(transaction), 0, w, [None] * k, 0, k, matched)
+
+    def all_fitemsets(self, store_itemsets, minsup_count):
+        """
+        Stores all the itemsets present at the leaves of the hash-tree, into store itemsets
+        :param store_itemsets: empty python-dictionary
+        :param minsup_count: int
+        :return: None
+        """
+        k = self.k
+        items = self.items
+        for cid, supp_count in enumerate(self.supp_counts):
+            if supp_count >= minsup_count:
+                store_itemsets[tuple(items[k * cid: k * (cid + 1)])] = supp_count
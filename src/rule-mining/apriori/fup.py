@@ -0,0 +1,149 @@
+"""
+FUP (Fast UPdate) Algorithm (Cheung, Han, Ng, Wong) for incremental mining of frequent itemsets,
+frequent itemsets of a database are updated for a batch of newly appended transactions, the old transactions are
+scanned only for the itemsets that were not frequent before and may have become frequent
+"""
+
+from apriori_hashtree import apriori_gen, gen_freq_itemsets
+from bitmap import BitmapIndex
+
+
+def _private_count_supports(batches, candidate_itemsets, k):
+    """
+    Returns python list of support counts of candidate k-itemsets (python tuples) in all the batches of transactions
+    """
+    supp_counts = [0] * len(candidate_itemsets)
+    if len(candidate_itemsets) == 0:
+        return supp_counts
+    candidate_items = sorted({item for itemset in candidate_itemsets for item in itemset})
+    for transactions in batches:
+        bitmap_index = BitmapIndex(transactions, candidate_items)
+        for i, supp_count in enumerate(bitmap_index.support_counts(candidate_itemsets, k)):
+            supp_counts[i] += int(supp_count)
+    return supp_counts
+
+
+def fup_update(freq_itemsets, old_transactions, new_transactions, min_sup=0.5, max_len=None):
+    """
+    Updates frequent itemsets of old_transactions for the new_transactions appended to them, using FUP algorithm
+        Parameters
+        -----------
+        freq_itemsets : python list of dictionaries
+          Frequent itemsets of old_transactions at min_sup (output of gen_freq_itemsets or of previous fup_update)
+
+        old_transactions : python list of batches of transactions
+          each batch is a python dictionary with TID as key and transactions as value (or a TransactionDB),
+          these are scanned only if some itemsets not frequent in them may have become frequent
+
+        new_transactions : python dictionary with TID as key and transactions as value (or a TransactionDB)
+          Newly appended transactions
+
+        min_sup : float (default: 0.5)
+          A float between 0 and 1 for minimum support of the item-sets returned (same as that of freq_itemsets).
+
+        max_len : int (default: None)
+          Maximum length of the item-sets generated (same as that of freq_itemsets).
+
+        Returns
+        -----------
+        List of Python Dictionary , denoted as freq_itemsets
+            freq_itemsets[k] is a python dictionary :
+                key: python tuple, denoting frequent itemset
+                value: int, supp_count of the itemset in old_transactions and new_transactions together
+    """
+    n_old = sum(len(transactions) for transactions in old_transactions)
+    d = len(new_transactions)
+    min_supp_count = min_sup * (n_old + d)
+    # an itemset not frequent in old_transactions can be frequent in the updated database only if it is
+    # frequent in new_transactions
+    min_supp_count_new = min_sup * d
+
+    # frequent 1-itemsets
+    new_counts = dict()
+    for _, t in new_transactions.items():
+        for item in t:
+            s = (item,)
+            if s in new_counts:
+                new_counts[s] += 1
+            else:
+                new_counts[s] = 1
+    old_freq_one_itemsets = freq_itemsets[0] if freq_itemsets else dict()
+    freq_one_itemsets = dict()
+    for itemset, supp_count in old_freq_one_itemsets.items():
+        supp_count += new_counts.get(itemset, 0)
+        if supp_count >= min_supp_count:
+            freq_one_itemsets[itemset] = supp_count
+    promoted = [itemset for itemset, supp_count in new_counts.items()
+                if itemset not in old_freq_one_itemsets and supp_count >= min_supp_count_new]
+    for itemset, supp_count in zip(promoted, _private_count_supports(old_transactions, promoted, 1)):
+        supp_count += new_counts[itemset]
+        if supp_count >= min_supp_count:
+            freq_one_itemsets[itemset] = supp_count
+    updated_freq_itemsets = [dict(sorted(freq_one_itemsets.items()))]
+
+    k = 1
+    while True:
+        k += 1
+        if max_len is not None and k > max_len:
+            break
+        # any frequent k-itemset of the updated database is a candidate generated from its frequent (k-1)-itemsets
+        candidate_itemsets = [tuple(itemset) for itemset in apriori_gen(updated_freq_itemsets[k - 2], k - 1)]
+        if len(candidate_itemsets) == 0:
+            break
+        old_freq_kitemsets = freq_itemsets[k - 1] if k <= len(freq_itemsets) else dict()
+        # one scan of new_transactions for all the candidates
+        new_supp_counts = _private_count_supports([new_transactions], candidate_itemsets, k)
+        freq_kitemsets = dict()
+        promoted = []
+        promoted_new_supp_counts = []
+        for itemset, new_supp_count in zip(candidate_itemsets, new_supp_counts):
+            if itemset in old_freq_kitemsets:
+                supp_count = old_freq_kitemsets[itemset] + new_supp_count
+                if supp_count >= min_supp_count:
+                    freq_kitemsets[itemset] = supp_count
+            elif new_supp_count >= min_supp_count_new:
+                promoted.append(itemset)
+                promoted_new_supp_counts.append(new_supp_count)
+        # scan of old_transactions only for the newly promoted candidates
+        old_supp_counts = _private_count_supports(old_transactions, promoted, k)
+        for itemset, old_supp_count, new_supp_count in zip(promoted, old_supp_counts, promoted_new_supp_counts):
+            if old_supp_count + new_supp_count >= min_supp_count:
+                freq_kitemsets[itemset] = old_supp_count + new_supp_count
+        if len(freq_kitemsets) == 0:
+            break
+        updated_freq_itemsets.append(freq_kitemsets)
+    return updated_freq_itemsets
+
+
+class IncrementalMiner:
+    """
+    Class for Incremental Miner, keeps the frequent itemsets of all the transactions seen so far (as batches)
+    and updates them with FUP algorithm as new batches of transactions arrive
+    """
+
+    def __init__(self, transactions, min_sup=0.5, max_len=None, **kwargs):
+        """
+        Mines the initial batch of transactions with gen_freq_itemsets
+        :param transactions: python dictionary with TID as key and transactions as value (or a TransactionDB)
+        :param min_sup: float, minimum support threshold
+        :param max_len: int, maximum length of the itemsets
+        :param kwargs: additional keyword arguments of gen_freq_itemsets (for ex. backend)
+        """
+        self.min_sup = min_sup
+        self.max_len = max_len
+        self.batches = [transactions]
+        self.freq_itemsets = gen_freq_itemsets(transactions, min_sup=min_sup, max_len=max_len, **kwargs)
+
+    def update(self, new_transactions):
+        """
+        Appends a batch of transactions, and updates the frequent itemsets
+        :param new_transactions: python dictionary with TID as key and transactions as value (or a TransactionDB)
+        :return: frequent itemsets of all the batches (same format as gen_freq_itemsets)
+        """
+        self.freq_itemsets = fup_update(self.freq_itemsets, self.batches, new_transactions,
+                                        min_sup=self.min_sup, max_len=self.max_len)
+        self.batches.append(new_transactions)
+        return self.freq_itemsets
+
+    def __len__(self):
+        return sum(len(transactions) for transactions in self.batches)
@@ -0,0 +1,159 @@
+"""
+Support-lattice Cache of frequent itemsets, keyed by a fingerprint of the transactions (and the miner),
+the frequent itemsets at the lowest minimum support mined so far are stored on disk, queries at a higher minimum
+support are answered by filtering them, queries at a lower one are mined and replace them, least recently used
+entries are evicted when the cache grows beyond its size limit
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import numpy as np
+from apriori_hashtree import gen_freq_itemsets, gen_rules, _private_freq_itemsets_by_size
+
+# miner options under which the itemsets at a higher support are not a subset of those at a lower one
+_UNSUPPORTED_MINER_KWARGS = ('top_k', 'closed', 'maximal', 'result')
+
+
+def _private_encode(value):
+    """
+    Returns length-prefixed bytes of repr of value (numpy scalars as the equal python scalars), so that a sequence of
+    encoded values is never ambiguous
+    """
+    encoded = repr(value.item() if isinstance(value, np.generic) else value).encode()
+    return len(encoded).to_bytes(8, 'little') + encoded
+
+
+def fingerprint(transactions):
+    """
+    Returns fingerprint (hex digest) of transactions, equal for equal transactions (TIDs and items, in any order
+    of items), in a single scan
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for tid, t in transactions.items():
+        items = sorted(map(_private_encode, t))
+        digest.update(_private_encode(tid) + len(items).to_bytes(8, 'little') + b''.join(items))
+    return digest.hexdigest()
+
+
+def _private_filter_itemsets(freq_itemsets, min_supp_count):
+    """
+    Returns frequent itemsets (python list of dictionaries) with support count at least min_supp_count
+    """
+    filtered = [{itemset: supp_count for itemset, supp_count in k_itemsets.items() if supp_count >= min_supp_count}
+                for k_itemsets in freq_itemsets]
+    # frequent 1-itemsets are always reported (possibly empty), same as gen_freq_itemsets
+    while len(filtered) > 1 and not filtered[-1]:
+        filtered.pop()
+    return filtered if filtered else [dict()]
+
+
+class ItemsetCache:
+    """
+    Class for on-disk cache of frequent itemsets, every entry holds the frequent itemsets of a data-set (in the format
+    of gen_freq_itemsets) at the lowest minimum support queried so far
+    """
+
+    def __init__(self, directory, max_bytes=256 << 20, miner=None, **miner_kwargs):
+        """
+        :param directory: directory of the cache entries (created if it does not exist)
+        :param max_bytes: int, maximum total size of the entries on disk, least recently used entries are evicted
+                          beyond it (the entry just stored is always kept)
+        :param miner: frequent itemset miner, called as `miner(transactions, min_sup=min_sup, **miner_kwargs)`, any of
+                      apriori's gen_freq_itemsets, gen_freq_itemsets_tid or fpgrowth's gen_freq_itemsets,
+                      gen_freq_itemsets_projected_DB, None for apriori's gen_freq_itemsets
+        :param miner_kwargs: additional keyword arguments of the miner (for ex. max_len, backend), these are a part of
+                             the cache key
+        """
+        for name in _UNSUPPORTED_MINER_KWARGS:
+            if name in miner_kwargs:
+                raise ValueError(f'{name} is not supported by the cache, all the frequent itemsets must be mined')
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.miner = gen_freq_itemsets if miner is None else miner
+        self.miner_kwargs = miner_kwargs
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, data_fingerprint):
+        miner = f'{self.miner.__module__}.{self.miner.__qualname__}({sorted(self.miner_kwargs.items())!r})'
+        key = hashlib.blake2b(f'{data_fingerprint}|{miner}'.encode(), digest_size=20).hexdigest()
+        return os.path.join(self.directory, key + '.pickle')
+
+    def _load(self, path):
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        # access time of an entry is its modification time, for LRU eviction
+        os.utime(path)
+        return entry
+
+    def _store(self, path, entry):
+        # written to a temporary file first, so that a partially written entry is never read
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._evict(keep=path)
+
+    def _evict(self, keep=None):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.pickle'):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                os.remove(path)
+                total -= size
+
+    def freq_itemsets(self, transactions, min_sup=0.5, data_fingerprint=None):
+        """
+        Returns frequent itemsets of transactions, from the cache if they were mined at the same or a lower minimum
+        support before, otherwise they are mined and stored (replacing those at a higher minimum support)
+        :param transactions: python dictionary with TID as key and transactions as value (or a TransactionDB)
+        :param min_sup: float, minimum support threshold
+        :param data_fingerprint: str, fingerprint of the transactions if known (for ex. a version of the data-set),
+                                 None to compute it from the transactions (a single scan)
+        :return: List of Python Dictionary (same format as gen_freq_itemsets)
+        """
+        if data_fingerprint is None:
+            data_fingerprint = fingerprint(transactions)
+        path = self._path(data_fingerprint)
+        n = len(transactions)
+        entry = self._load(path) if os.path.exists(path) else None
+        if entry is not None and entry['min_sup'] <= min_sup:
+            self.hits += 1
+            return _private_filter_itemsets(entry['freq_itemsets'], min_sup * n)
+        self.misses += 1
+        # any output format of the miners (python dictionary, ItemsetTrie) is stored as a python list of dictionaries
+        freq_itemsets = [dict(k_itemsets.items()) for k_itemsets in
+                         _private_freq_itemsets_by_size(self.miner(transactions, min_sup=min_sup, **self.miner_kwargs))]
+        freq_itemsets = _private_filter_itemsets(freq_itemsets, min_sup * n)
+        self._store(path, {'min_sup': min_sup, 'n_transactions': n, 'freq_itemsets': freq_itemsets})
+        return freq_itemsets
+
+    def rules(self, transactions, min_sup=0.5, min_conf=0.6, data_fingerprint=None, **rule_kwargs):
+        """
+        Returns association rules of transactions, frequent itemsets are taken from the cache (see freq_itemsets), and
+        only the rules are generated
+        :param rule_kwargs: additional keyword arguments of gen_rules (for ex. n_jobs)
+        :return: output of gen_rules
+        """
+        return gen_rules(self.freq_itemsets(transactions, min_sup, data_fingerprint), min_conf=min_conf, **rule_kwargs)
+
+    def clear(self):
+        """
+        Removes all the entries of the cache
+        """
+        for name in os.listdir(self.directory):
+            if name.endswith('.pickle'):
+                os.remove(os.path.join(self.directory, name))
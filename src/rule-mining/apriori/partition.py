@@ -0,0 +1,128 @@
+"""
+Partition Algorithm (Savasere, Omiecinski, Navathe) for mining frequent itemsets from transaction files that do not
+fit in main memory, in exactly two sequential passes over the file
+"""
+
+from apriori_hashtree import gen_freq_itemsets
+from bitmap import BitmapIndex
+
+
+def _private_read_chunks(path, chunk_size):
+    """
+    Reads a transaction file (FIMI format, one transaction per line with space separated integer items)
+    in chunks of at most chunk_size transactions
+    :param path: str, path of the transaction file
+    :param chunk_size: int, max number of transactions in each chunk
+    :return: generator of python dictionaries with TID as key and (sorted) transaction as value
+    """
+    chunk = dict()
+    tid = 1
+    with open(path) as file:
+        for line in file:
+            transaction = sorted({int(item) for item in line.split() if item.isdecimal()})
+            if not transaction:
+                continue
+            chunk[tid] = transaction
+            tid += 1
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = dict()
+    if chunk:
+        yield chunk
+
+
+def _private_itemsets_of(freq_itemsets):
+    """
+    Returns set of all itemsets (as sorted tuples) from the output of any of the frequent itemset miners
+    :param freq_itemsets: python list of dictionaries (Apriori, AprioriTID, Eclat), python dictionary
+                          {itemset : supp_count} or ItemsetTrie (FP-growth)
+    :return: python set of tuples
+    """
+    if isinstance(freq_itemsets, dict):
+        return {tuple(sorted(itemset)) for itemset in freq_itemsets}
+    itemsets = set()
+    for freq_itemsets_k in freq_itemsets:
+        for itemset in freq_itemsets_k:
+            itemsets.add(tuple(sorted(itemset)))
+    return itemsets
+
+
+def gen_freq_itemsets_partition(source, min_sup=0.5, chunk_size=100000, miner=None, **miner_kwargs):
+    """
+    Get frequent itemsets from a transaction file (or database), using the Partition algorithm
+        Pass 1 : every chunk of the file is mined locally (in main memory) at min_sup, i.e. at the support count
+                 threshold scaled to the size of the chunk, any globally frequent itemset is locally frequent in at
+                 least one of the chunks
+        Pass 2 : union of locally frequent itemsets is counted over the full file, chunk by chunk
+        Parameters
+        -----------
+        source : str or TransactionDB
+          Path of the transaction file (FIMI format, one transaction per line with space separated integer items),
+          or a TransactionDB (for ex. memory-mapped with TransactionDB.load), which is read in chunks of chunk_size
+
+        min_sup : float (default: 0.5)
+          A float between 0 and 1 for minimum support of the item-sets returned.
+          The support is computed as the fraction
+          `transactions_where_item(s)_occur / total_transactions`.
+
+        chunk_size : int (default: 100000)
+          Max number of transactions held in main memory at once
+
+        miner : function (default: None)
+          Frequent itemset miner used to mine each chunk, called as `miner(chunk, min_sup=min_sup, **miner_kwargs)`,
+          any of apriori's gen_freq_itemsets, gen_freq_itemsets_tid or fpgrowth's gen_freq_itemsets,
+          gen_freq_itemsets_projected_DB. If `None` (default) apriori's gen_freq_itemsets is used.
+
+        miner_kwargs :
+          Additional keyword arguments for the miner (for ex. max_len, backend)
+
+        Returns
+        -----------
+        List of Python Dictionary , denoted as freq_itemsets
+            freq_itemsets[k] is a python dictionary :
+                key: python tuple, denoting frequent itemset
+                value: int, supp_count of the itemset
+    """
+    miner = gen_freq_itemsets if miner is None else miner
+    if isinstance(source, str):
+        def read_chunks():
+            return _private_read_chunks(source, chunk_size)
+    else:
+        def read_chunks():
+            return source.iter_chunks(chunk_size)
+    # Pass 1 : locally frequent itemsets of each chunk
+    candidate_itemsets = set()
+    n = 0
+    for chunk in read_chunks():
+        n += len(chunk)
+        candidate_itemsets.update(_private_itemsets_of(miner(chunk, min_sup=min_sup, **miner_kwargs)))
+
+    # candidate_itemsets_k[k] is list of all candidate (k+1)-itemsets
+    max_k = max((len(itemset) for itemset in candidate_itemsets), default=0)
+    candidate_itemsets_k = [[] for _ in range(max_k)]
+    for itemset in candidate_itemsets:
+        candidate_itemsets_k[len(itemset) - 1].append(itemset)
+    candidate_items = sorted({item for itemset in candidate_itemsets for item in itemset})
+
+    # Pass 2 : global support counts of all the candidates
+    supp_counts_k = [[0] * len(candidates) for candidates in candidate_itemsets_k]
+    if max_k > 0:
+        for chunk in read_chunks():
+            bitmap_index = BitmapIndex(chunk, candidate_items)
+            for k, candidates in enumerate(candidate_itemsets_k):
+                supp_counts = supp_counts_k[k]
+                for i, supp_count in enumerate(bitmap_index.support_counts(candidates, k + 1)):
+                    supp_counts[i] += int(supp_count)
+
+    # frequent 1-itemsets are always reported (possibly empty), same as gen_freq_itemsets
+    freq_itemsets = [dict()]
+    for k, (candidates, supp_counts) in enumerate(zip(candidate_itemsets_k, supp_counts_k)):
+        freq_kitemsets = {itemset: supp_count for itemset, supp_count in zip(candidates, supp_counts)
+                          if supp_count >= n * min_sup}
+        if len(freq_kitemsets) == 0:
+            break
+        if k == 0:
+            freq_itemsets[0] = freq_kitemsets
+        else:
+            freq_itemsets.append(freq_kitemsets)
+    return freq_itemsets
@@ -0,0 +1,165 @@
+"""
+Sampling Algorithm (Toivonen) for mining frequent itemsets, a random sample of the database is mined at a lowered
+threshold, and its frequent itemsets along with their negative border are verified in one pass over the database,
+frequent itemsets of the negative border (misses) are fixed in a second pass
+"""
+
+import math
+import random
+from apriori_hashtree import apriori_gen, gen_freq_itemsets
+from bitmap import BitmapIndex
+from partition import _private_itemsets_of
+
+
+def _private_count_itemsets(transactions, itemsets_k, supp_counts, count_items=False):
+    """
+    Counts support of all the itemsets in a single scan of the transactions (using BitmapIndex)
+    :param itemsets_k: python list, itemsets_k[k] is python list of (k+1)-itemsets (sorted tuples)
+    :param supp_counts: python dictionary, support counts are stored into it with itemsets as keys
+    :param count_items: bool, if True support counts of all the items (1-itemsets) are counted in the same scan
+    :return: None
+    """
+    items = sorted({item for itemsets in itemsets_k for itemset in itemsets for item in itemset})
+    if not items and not count_items:
+        return
+    bitmap_index = BitmapIndex(transactions, items, count_items=count_items)
+    if count_items:
+        for item, supp_count in bitmap_index.item_supp_counts.items():
+            supp_counts[(item,)] = supp_count
+    for k, itemsets in enumerate(itemsets_k):
+        for itemset, supp_count in zip(itemsets, bitmap_index.support_counts(itemsets, k + 1)):
+            supp_counts[itemset] = int(supp_count)
+
+
+def _private_uncounted_candidates(supp_counts, min_supp_count, max_len):
+    """
+    Returns all the itemsets which are not counted yet and may be frequent, i.e. itemsets all of whose subsets are
+    either counted and frequent or not counted (closure of the negative border w.r.t. the frequent itemsets)
+    :return: python list, itemsets_k[k] is python list of uncounted (k+1)-itemsets
+    """
+    frequent_k = dict()
+    for itemset, supp_count in supp_counts.items():
+        if supp_count >= min_supp_count:
+            frequent_k.setdefault(len(itemset), set()).add(itemset)
+    # all 1-itemsets are counted in the first pass
+    itemsets_k = [[]]
+    potential = frequent_k.get(1, set())
+    k = 1
+    while potential and (max_len is None or k < max_len):
+        uncounted = [itemset for itemset in map(tuple, apriori_gen(potential, k)) if itemset not in supp_counts]
+        k += 1
+        itemsets_k.append(uncounted)
+        potential = frequent_k.get(k, set()) | set(uncounted)
+    return itemsets_k
+
+
+def gen_freq_itemsets_sampling(transactions, min_sup=0.5, max_len=None, sample_size=None, sample_min_sup=None,
+                               delta=0.01, fix_misses=True, miner=None, seed=None, **miner_kwargs):
+    """
+    Get frequent itemsets from a transaction basket, using Toivonen's Sampling algorithm
+        Parameters
+        -----------
+        transactions : python dictionary with TID as key and transactions as value (or a TransactionDB)
+          Set of all transactions in the data-set
+
+        min_sup : float (default: 0.5)
+          A float between 0 and 1 for minimum support of the item-sets returned.
+          The support is computed as the fraction
+          `transactions_where_item(s)_occur / total_transactions`.
+
+        max_len : int (default: None)
+          Maximum length of the item-sets generated. If `None` (default) all
+          possible item-sets lengths are evaluated.
+
+        sample_size : int (default: None)
+          Number of transactions in the random sample. If `None` (default) 10% of the transactions
+          (at least 1000) are sampled.
+
+        sample_min_sup : float (default: None)
+          Lowered minimum support used to mine the sample. If `None` (default) it is
+          `min_sup - sqrt(ln(1 / delta) / (2 * sample_size))` (but not below min_sup / 2), so that by Hoeffding's
+          bound a frequent itemset is infrequent in the sample with probability at most delta
+
+        delta : float (default: 0.01)
+          Probability of a frequent itemset being missed in the sample (used only if sample_min_sup is None)
+
+        fix_misses : bool (default: True)
+          If True and some itemsets of the negative border are frequent, all the itemsets that may be frequent
+          beyond the negative border are counted in a second pass, and the returned frequent itemsets are exact.
+          If False, the result of the first pass is returned, which is exact only if there are no misses.
+
+        miner : function (default: None)
+          Frequent itemset miner used to mine the sample, called as
+          `miner(sample, min_sup=sample_min_sup, **miner_kwargs)`, any of apriori's gen_freq_itemsets,
+          gen_freq_itemsets_tid or fpgrowth's gen_freq_itemsets, gen_freq_itemsets_projected_DB.
+          If `None` (default) apriori's gen_freq_itemsets is used.
+
+        seed : int (default: None)
+          Seed of the random sample
+
+        miner_kwargs :
+          Additional keyword arguments for the miner (for ex. backend), max_len is passed to the miner if given
+
+        Returns
+        -----------
+        (freq_itemsets, misses)
+        freq_itemsets : List of Python Dictionary
+            freq_itemsets[k] is a python dictionary :
+                key: python tuple, denoting frequent itemset
+                value: int, supp_count of the itemset
+        misses : python list of itemsets (python tuples) of the negative border of the sample's frequent itemsets
+                 which are frequent in the data-set, empty iff one pass was enough
+    """
+    miner = gen_freq_itemsets if miner is None else miner
+    n = len(transactions)
+    min_supp_count = n * min_sup
+    if sample_size is None:
+        sample_size = max(1000, n // 10)
+    sample_size = min(sample_size, n)
+    if sample_min_sup is None:
+        sample_min_sup = min_sup
+        if sample_size > 0:
+            sample_min_sup = max(min_sup - math.sqrt(math.log(1 / delta) / (2 * sample_size)), min_sup / 2)
+    if max_len is not None:
+        miner_kwargs['max_len'] = max_len
+
+    # frequent itemsets of the random sample
+    tids = random.Random(seed).sample(list(transactions.keys()), sample_size)
+    sample = {tid: transactions[tid] for tid in tids}
+    sample_itemsets = _private_itemsets_of(miner(sample, min_sup=sample_min_sup, **miner_kwargs))
+    sample_itemsets_k = dict()
+    for itemset in sample_itemsets:
+        sample_itemsets_k.setdefault(len(itemset), set()).add(itemset)
+
+    # First pass : support counts of all the items, sample's frequent itemsets and their negative border
+    # (negative border : itemsets not frequent in the sample, all of whose subsets are frequent in the sample)
+    # (1-itemsets are counted while the bit-vectors are built, so that the database is scanned once)
+    border = []
+    itemsets_k = [[]]
+    k = 1
+    while k in sample_itemsets_k and (max_len is None or k < max_len):
+        candidates = [tuple(itemset) for itemset in apriori_gen(sample_itemsets_k[k], k)]
+        k += 1
+        border.extend(itemset for itemset in candidates if itemset not in sample_itemsets)
+        itemsets_k.append(sorted(sample_itemsets_k.get(k, set()) | set(candidates)))
+    supp_counts = dict()
+    _private_count_itemsets(transactions, itemsets_k, supp_counts, count_items=True)
+    border.extend(itemset for itemset in supp_counts if len(itemset) == 1 and itemset not in sample_itemsets)
+    misses = sorted(itemset for itemset in border if supp_counts[itemset] >= min_supp_count)
+
+    # Second pass : itemsets beyond the negative border which may be frequent
+    if misses and fix_misses:
+        _private_count_itemsets(transactions, _private_uncounted_candidates(supp_counts, min_supp_count, max_len),
+                                supp_counts)
+
+    # frequent 1-itemsets are always reported (possibly empty), same as gen_freq_itemsets
+    freq_itemsets = [dict()]
+    for itemset, supp_count in sorted(supp_counts.items()):
+        if supp_count >= min_supp_count:
+            while len(freq_itemsets) < len(itemset):
+                freq_itemsets.append(dict())
+            freq_itemsets[len(itemset) - 1][itemset] = supp_count
+    # without the second pass, itemsets beyond a missed level may leave empty levels in between
+    while len(freq_itemsets) > 1 and not freq_itemsets[-1]:
+        freq_itemsets.pop()
+    return freq_itemsets, misses
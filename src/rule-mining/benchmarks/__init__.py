@@ -0,0 +1,2 @@
+from quest import gen_quest_transactions, parse_quest_name, write_fimi
+from run_benchmarks import run_benchmarks
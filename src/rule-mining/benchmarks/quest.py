@@ -0,0 +1,119 @@
+"""
+Synthetic basket data generator in the style of IBM Quest (Agrawal, Srikant), transactions are built from a pool of
+weighted, corrupted, partially overlapping potentially frequent itemsets (patterns), data-sets are named as
+TxxIyyDzzzK (average transaction size xx, average pattern size yy, zzz thousand transactions)
+"""
+
+import re
+import numpy as np
+
+_NAME = re.compile(r'^T(\d+(?:\.\d+)?)I(\d+(?:\.\d+)?)D(\d+)([KM]?)(?:N(\d+)([KM]?))?(?:L(\d+)([KM]?))?$')
+_MULTIPLIERS = {'': 1, 'K': 1000, 'M': 1000000}
+# maximum number of patterns drawn for a transaction, per item of its size
+_MAX_DRAWS_PER_ITEM = 20
+
+
+def parse_quest_name(name):
+    """
+    Returns parameters of gen_quest_transactions for a data-set name, for ex. T10I4D100K (optionally followed by
+    Nxx : number of items, Lxx : number of patterns, for ex. T10I4D100KN1KL2K)
+    :return: python dictionary of keyword arguments of gen_quest_transactions
+    """
+    match = _NAME.match(name)
+    if match is None:
+        raise ValueError(f'Invalid data-set name : {name}, expected TxxIyyDzzz[K|M] (optionally Nxx, Lxx)')
+    t, i, d, d_unit, n, n_unit, l, l_unit = match.groups()
+    params = {'n_transactions': int(d) * _MULTIPLIERS[d_unit], 'avg_transaction_len': float(t),
+              'avg_pattern_len': float(i)}
+    if n is not None:
+        params['n_items'] = int(n) * _MULTIPLIERS[n_unit]
+    if l is not None:
+        params['n_patterns'] = int(l) * _MULTIPLIERS[l_unit]
+    return params
+
+
+def _private_gen_patterns(rng, n_items, n_patterns, avg_pattern_len, correlation):
+    """
+    Returns python list of patterns (python lists of items), a pattern takes a fraction (exponentially distributed
+    with mean correlation) of its items from the previous pattern, and the rest at random
+    """
+    patterns = []
+    previous = []
+    for _ in range(n_patterns):
+        size = max(1, min(n_items, int(rng.poisson(avg_pattern_len - 1)) + 1))
+        n_common = min(len(previous), size, int(round(min(1.0, rng.exponential(correlation)) * size)))
+        pattern = set(rng.choice(previous, n_common, replace=False).tolist()) if n_common > 0 else set()
+        while len(pattern) < size:
+            pattern.add(int(rng.integers(n_items)))
+        previous = list(pattern)
+        patterns.append(previous)
+    return patterns
+
+
+def gen_quest_transactions(n_transactions=10000, avg_transaction_len=10, avg_pattern_len=4, n_items=1000,
+                           n_patterns=2000, correlation=0.5, corruption_mean=0.5, corruption_var=0.1, seed=0):
+    """
+    Generates synthetic basket data (IBM Quest style)
+    :param n_transactions: int, number of transactions (D)
+    :param avg_transaction_len: float, average size of a transaction (T), sizes are Poisson distributed
+    :param avg_pattern_len: float, average size of a potentially frequent itemset (I), sizes are Poisson distributed
+    :param n_items: int, number of items (N), items are 0, 1, ..., n_items - 1
+    :param n_patterns: int, number of potentially frequent itemsets (L)
+    :param correlation: float, mean fraction of the items of a pattern shared with the previous pattern
+    :param corruption_mean: float, mean corruption level of the patterns, items of a pattern are dropped from a
+                            transaction while a uniform random number is less than its corruption level
+    :param corruption_var: float, variance of the corruption levels (normally distributed, clipped to [0, 1])
+    :param seed: int, seed of the random generator (same seed, same data-set)
+    :return: python dictionary with TID (1, 2, ..., n_transactions) as key and transaction (sorted python list of
+             items) as value
+    """
+    rng = np.random.default_rng(seed)
+    patterns = _private_gen_patterns(rng, n_items, n_patterns, avg_pattern_len, correlation)
+    weights = rng.exponential(1.0, n_patterns)
+    weights /= weights.sum()
+    corruption = np.clip(rng.normal(corruption_mean, np.sqrt(corruption_var), n_patterns), 0.0, 1.0)
+    # a transaction can not have more items than all the patterns together
+    max_size = len({item for pattern in patterns for item in pattern})
+
+    # patterns are drawn in blocks, for speed
+    block = max(1024, int(n_transactions * avg_transaction_len / max(1.0, avg_pattern_len)) // 16)
+    drawn = iter(())
+    transactions = dict()
+    carried = None
+    for tid in range(1, n_transactions + 1):
+        size = max(1, min(max_size, int(rng.poisson(avg_transaction_len))))
+        transaction = set()
+        # number of patterns drawn is bounded, as heavily corrupted patterns may add no items at all
+        n_draws = 0
+        while len(transaction) < size and n_draws < _MAX_DRAWS_PER_ITEM * size:
+            n_draws += 1
+            if carried is not None:
+                pattern, carried = carried, None
+            else:
+                pattern = next(drawn, None)
+                if pattern is None:
+                    drawn = iter(rng.choice(n_patterns, block, p=weights).tolist())
+                    pattern = next(drawn)
+            items = patterns[pattern]
+            # corrupted pattern : items are dropped while a uniform random number is below the corruption level
+            n_kept = len(items)
+            while n_kept > 0 and rng.random() < corruption[pattern]:
+                n_kept -= 1
+            items = items[:n_kept] if n_kept == len(items) else rng.choice(items, n_kept, replace=False).tolist()
+            if transaction and len(transaction) + len(items) > size and rng.random() < 0.5:
+                # pattern does not fit, it is put into the next transaction instead (half of the times)
+                carried = pattern
+                break
+            transaction.update(items)
+        transactions[tid] = sorted(transaction)
+    return transactions
+
+
+def write_fimi(transactions, path):
+    """
+    Writes transactions in FIMI format (one transaction per line, items separated by spaces), readable with
+    TransactionDB.from_fimi
+    """
+    with open(path, 'w') as f:
+        for _, t in transactions.items():
+            f.write(' '.join(map(str, t)) + '\n')
@@ -0,0 +1,197 @@
+"""
+Benchmark harness of the frequent itemset miners, every miner is run on synthetic Quest data-sets over a grid of
+minimum supports, each run in a fresh process so that its peak resident memory is measured alone, wall time, peak
+RSS and the number of frequent itemsets are written to a JSON report, and all the miners must agree on the itemsets
+
+Usage (from src/rule-mining) :
+    python benchmarks/run_benchmarks.py --datasets T10I4D10K T10I4D50K --min-sup 0.01 0.005 --output report.json
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _directory in ('apriori', 'fpgrowth', 'transactions', 'benchmarks'):
+    if os.path.join(_ROOT, _directory) not in sys.path:
+        sys.path.append(os.path.join(_ROOT, _directory))
+
+from apriori_hashtree import gen_freq_itemsets as apriori_gen_freq_itemsets
+from apriori_tid import gen_freq_itemsets_tid
+from fp_growth import gen_freq_itemsets as fp_gen_freq_itemsets, gen_freq_itemsets_projected_DB
+from quest import gen_quest_transactions, parse_quest_name
+
+# miner name -> function(transactions, min_sup), the first four are run by default
+MINERS = {
+    'apriori': lambda transactions, min_sup: apriori_gen_freq_itemsets(transactions, min_sup=min_sup),
+    'apriori_tid': lambda transactions, min_sup: gen_freq_itemsets_tid(transactions, min_sup=min_sup),
+    'fpgrowth': lambda transactions, min_sup: fp_gen_freq_itemsets(transactions, min_sup=min_sup),
+    'fpgrowth_projected_DB': lambda transactions, min_sup: gen_freq_itemsets_projected_DB(transactions,
+                                                                                          min_sup=min_sup),
+    'apriori_bitmap': lambda transactions, min_sup: apriori_gen_freq_itemsets(transactions, min_sup=min_sup,
+                                                                              backend="bitmap"),
+    'fpgrowth_array': lambda transactions, min_sup: fp_gen_freq_itemsets(transactions, min_sup=min_sup,
+                                                                         backend="array_fptree"),
+    'fpgrowth_projected_DB_partition': lambda transactions, min_sup: gen_freq_itemsets_projected_DB(
+        transactions, min_sup=min_sup, projection="partition"),
+}
+DEFAULT_MINERS = ['apriori', 'apriori_tid', 'fpgrowth', 'fpgrowth_projected_DB']
+
+
+def _private_itemsets_digest(freq_itemsets):
+    """
+    Returns (number of itemsets, digest of all the (itemset, supp_count) pairs) for the output of any miner
+    (python list of dictionaries by size, or python dictionary), independent of the order of itemsets and items
+    """
+    levels = freq_itemsets if isinstance(freq_itemsets, list) else [freq_itemsets]
+    pairs = sorted((tuple(sorted(itemset)), int(supp_count)) for k_itemsets in levels
+                   for itemset, supp_count in k_itemsets.items())
+    return len(pairs), hashlib.blake2b(repr(pairs).encode(), digest_size=16).hexdigest()
+
+
+def _private_peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, in kilobytes on Linux
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _private_run(conn, miner, transactions, min_sup):
+    """
+    Runs one miner in a worker process, and sends its measurements back through conn
+    """
+    try:
+        baseline_rss_kb = _private_peak_rss_kb()
+        start = time.perf_counter()
+        freq_itemsets = MINERS[miner](transactions, min_sup)
+        wall_time = time.perf_counter() - start
+        n_itemsets, digest = _private_itemsets_digest(freq_itemsets)
+        conn.send({'status': 'ok', 'wall_time_s': wall_time, 'peak_rss_kb': _private_peak_rss_kb(),
+                   'baseline_rss_kb': baseline_rss_kb, 'itemsets': n_itemsets, 'digest': digest})
+    except Exception as e:
+        conn.send({'status': 'error', 'error': f'{type(e).__name__}: {e}'})
+    finally:
+        conn.close()
+
+
+def run_once(miner, transactions, min_sup, timeout=None):
+    """
+    Runs miner on transactions in a fresh process (transactions are inherited on fork, pickled otherwise)
+    :param miner: str, name of the miner (key of MINERS)
+    :param timeout: float, seconds after which the run is stopped, None for no limit
+    :return: python dictionary of measurements, status is "ok", "error" or "timeout"
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_private_run, args=(sender, miner, transactions, min_sup))
+    process.start()
+    sender.close()
+    if receiver.poll(timeout):
+        try:
+            result = receiver.recv()
+        except EOFError:
+            result = {'status': 'error', 'error': f'worker exited with code {process.exitcode}'}
+    else:
+        process.terminate()
+        result = {'status': 'timeout', 'timeout_s': timeout}
+    process.join()
+    receiver.close()
+    return result
+
+
+def run_benchmarks(datasets, min_sups, miners=None, repeat=1, timeout=None, seed=0, log=None):
+    """
+    Runs all the miners on all the data-sets at all the minimum supports
+    :param datasets: python list of data-set names (TxxIyyDzzzK, see quest.parse_quest_name)
+    :param min_sups: python list of minimum support thresholds
+    :param miners: python list of miner names (keys of MINERS), None for DEFAULT_MINERS
+    :param repeat: int, number of runs of each configuration, the fastest is reported (peak RSS is the largest)
+    :param timeout: float, seconds after which a run is stopped (and not repeated), None for no limit
+    :param seed: int, seed of the data generator
+    :param log: file to print progress to (for ex. sys.stderr), None for no progress
+    :return: python dictionary (report), with the environment, measurements of all the runs, and disagreements
+             (configurations where successful miners found different itemsets)
+    """
+    miners = DEFAULT_MINERS if miners is None else miners
+    for miner in miners:
+        if miner not in MINERS:
+            raise ValueError(f'Unknown miner : {miner}, expected one of {", ".join(MINERS)}')
+    runs = []
+    disagreements = []
+    for dataset in datasets:
+        params = parse_quest_name(dataset)
+        start = time.perf_counter()
+        transactions = gen_quest_transactions(seed=seed, **params)
+        generation_time = time.perf_counter() - start
+        for min_sup in min_sups:
+            digests = dict()
+            for miner in miners:
+                result = None
+                for _ in range(repeat):
+                    measurement = run_once(miner, transactions, min_sup, timeout)
+                    if measurement['status'] != 'ok':
+                        result = measurement
+                        break
+                    if result is None:
+                        result = measurement
+                    else:
+                        result['wall_time_s'] = min(result['wall_time_s'], measurement['wall_time_s'])
+                        result['peak_rss_kb'] = max(result['peak_rss_kb'], measurement['peak_rss_kb'])
+                run = {'dataset': dataset, **params, 'seed': seed, 'generation_time_s': generation_time,
+                       'min_sup': min_sup, 'miner': miner, 'repeat': repeat, **result}
+                runs.append(run)
+                if result['status'] == 'ok':
+                    digests[miner] = (result['itemsets'], result['digest'])
+                if log is not None:
+                    summary = (f'{result["wall_time_s"]:.3f}s, {result["peak_rss_kb"]} KiB, '
+                               f'{result["itemsets"]} itemsets') if result['status'] == 'ok' else result['status']
+                    print(f'{dataset} min_sup={min_sup} {miner} : {summary}', file=log, flush=True)
+            if len(set(digests.values())) > 1:
+                disagreements.append({'dataset': dataset, 'min_sup': min_sup,
+                                      'itemsets': {miner: itemsets for miner, (itemsets, _) in digests.items()},
+                                      'digests': {miner: digest for miner, (_, digest) in digests.items()}})
+    return {'environment': {'python': sys.version.split()[0], 'platform': platform.platform(),
+                            'cpu_count': os.cpu_count()},
+            'runs': runs,
+            'disagreements': disagreements}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the frequent itemset miners on synthetic Quest data')
+    parser.add_argument('--datasets', nargs='+', default=['T10I4D10K', 'T10I4D50K'],
+                        help='data-set names TxxIyyDzzz[K|M] (optionally Nxx, Lxx)')
+    parser.add_argument('--min-sup', nargs='+', type=float, default=[0.02, 0.01, 0.005], dest='min_sups',
+                        help='minimum support thresholds')
+    parser.add_argument('--miners', nargs='+', default=DEFAULT_MINERS, choices=list(MINERS),
+                        help='miners to run')
+    parser.add_argument('--repeat', type=int, default=1, help='runs of each configuration, the fastest is kept')
+    parser.add_argument('--timeout', type=float, default=None, help='seconds after which a run is stopped')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the data generator')
+    parser.add_argument('--output', default=None, help='path of the JSON report (stdout if not given)')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.datasets, args.min_sups, args.miners, args.repeat, args.timeout, args.seed,
+                            log=sys.stderr)
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    for disagreement in report['disagreements']:
+        print(f'Miners disagree on {disagreement["dataset"]} at min_sup={disagreement["min_sup"]} : '
+              f'{disagreement["itemsets"]}', file=sys.stderr)
+    # non-zero exit status if the miners disagree, for use in CI
+    return 1 if report['disagreements'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
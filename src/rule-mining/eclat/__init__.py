@@ -0,0 +1 @@
+from eclat import gen_freq_itemsets_eclat
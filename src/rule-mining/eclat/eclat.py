@@ -0,0 +1,141 @@
+"""
+Eclat, dEclat (Eclat with diffsets) Implementation using Python.
+Depth-first search over the itemset lattice on a vertical layout of the database, each itemset carries its tidset
+(sorted numpy array of indices of the transactions containing it), or its diffset w.r.t. its prefix in dense regions
+"""
+
+import numpy as np
+
+
+def _private_intersect(tidset1, tidset2):
+    """
+    Returns intersection of two sorted numpy arrays (without duplicates), as a sorted numpy array
+    """
+    if len(tidset1) > len(tidset2):
+        tidset1, tidset2 = tidset2, tidset1
+    if len(tidset1) == 0:
+        return tidset1
+    # binary search every element of the smaller array in the larger one
+    idx = np.searchsorted(tidset2, tidset1)
+    idx[idx == len(tidset2)] = 0
+    return tidset1[tidset2[idx] == tidset1]
+
+
+def _private_difference(tidset1, tidset2):
+    """
+    Returns tidset1 - tidset2 for two sorted numpy arrays (without duplicates), as a sorted numpy array
+    """
+    if len(tidset2) == 0 or len(tidset1) == 0:
+        return tidset1
+    idx = np.searchsorted(tidset2, tidset1)
+    idx[idx == len(tidset2)] = 0
+    return tidset1[tidset2[idx] != tidset1]
+
+
+def _private_vertical_db(transactions, n, min_sup):
+    """
+    Builds the tidsets of all the frequent items from a transaction basket
+    :return: python list of (item, tidset) pairs, in increasing order of support count
+    """
+    item_tids = dict()
+    for idx, (_, t) in enumerate(transactions.items()):
+        for item in t:
+            if item in item_tids:
+                item_tids[item].append(idx)
+            else:
+                item_tids[item] = [idx]
+    freq_items = [(item, np.array(tids, dtype=np.int64)) for item, tids in item_tids.items()
+                  if len(tids) >= n * min_sup]
+    freq_items.sort(key=lambda pair: len(pair[1]))
+    return freq_items
+
+
+def _private_eclat(prefix, eq_class, is_diffset, min_supp_count, max_len, diffsets, freq_itemsets):
+    """
+    Mines all frequent itemsets with prefix in the equivalence class eq_class
+    :param prefix: python list of items, common prefix of the equivalence class
+    :param eq_class: python list of (item, tidset or diffset, supp_count), prefix + [item] is frequent for each member
+    :param is_diffset: bool, True if members of eq_class carry diffsets w.r.t. prefix instead of tidsets
+    :param min_supp_count: float, minimum support count threshold
+    :param max_len: int or None, maximum length of the itemsets
+    :param diffsets: "auto", True or False, see gen_freq_itemsets_eclat
+    :param freq_itemsets: python list of dictionaries, stores all frequent itemsets found
+    :return: None
+    """
+    k = len(prefix) + 1
+    if max_len is not None and k >= max_len:
+        return
+    m = len(eq_class)
+    for i in range(m):
+        item_i, set_i, supp_count_i = eq_class[i]
+        itemset_i = [*prefix, item_i]
+        # members of the new equivalence class with prefix itemset_i
+        new_class = []
+        for j in range(i + 1, m):
+            item_j, set_j, _ = eq_class[j]
+            if is_diffset:
+                # d(Pij) = d(Pj) - d(Pi), sup(Pij) = sup(Pi) - |d(Pij)|
+                new_set = _private_difference(set_j, set_i)
+                supp_count = supp_count_i - len(new_set)
+            else:
+                new_set = _private_intersect(set_i, set_j)
+                supp_count = len(new_set)
+            if supp_count >= min_supp_count:
+                new_class.append((item_j, new_set, supp_count))
+        if not new_class:
+            continue
+
+        new_is_diffset = is_diffset
+        if not is_diffset and diffsets is not False:
+            # switch to diffsets d(Pij) = t(Pi) - t(Pij), when they are smaller in total than tidsets
+            diffset_size = sum(supp_count_i - supp_count for _, _, supp_count in new_class)
+            tidset_size = sum(supp_count for _, _, supp_count in new_class)
+            if diffsets is True or diffset_size < tidset_size:
+                new_class = [(item_j, _private_difference(set_i, new_set), supp_count)
+                             for item_j, new_set, supp_count in new_class]
+                new_is_diffset = True
+
+        if len(freq_itemsets) <= k:
+            freq_itemsets.append(dict())
+        for item_j, _, supp_count in new_class:
+            freq_itemsets[k][tuple(sorted([*itemset_i, item_j]))] = supp_count
+        _private_eclat(itemset_i, new_class, new_is_diffset, min_supp_count, max_len, diffsets, freq_itemsets)
+
+
+def gen_freq_itemsets_eclat(transactions, min_sup=0.5, max_len=None, diffsets="auto"):
+    """
+    Get frequent itemsets from a transaction basket, using Eclat / dEclat algorithm
+        Parameters
+        -----------
+        transactions : python dictionary with TID as key and transactions as value (or a TransactionDB)
+          Set of all transactions in the data-set
+
+        min_sup : float (default: 0.5)
+          A float between 0 and 1 for minimum support of the item-sets returned.
+          The support is computed as the fraction
+          `transactions_where_item(s)_occur / total_transactions`.
+
+        max_len : int (default: None)
+          Maximum length of the item-sets generated. If `None` (default) all
+          possible item-sets lengths are evaluated.
+
+        diffsets : "auto", True or False (default: "auto")
+          "auto" : an equivalence class switches from tidsets to diffsets (dEclat) as soon as its diffsets are
+                   smaller in total than its tidsets, and stays with diffsets below it
+          True : diffsets are used from 2-itemsets onwards
+          False : tidsets are used throughout (Eclat)
+
+        Returns
+        -----------
+        List of Python Dictionary , denoted as freq_itemsets
+            freq_itemsets[k] is a python dictionary :
+                key: python tuple, denoting frequent itemset (items in sorted order)
+                value: int, supp_count of the itemset
+    """
+    n = len(transactions)
+    min_supp_count = n * min_sup
+    freq_items = _private_vertical_db(transactions, n, min_sup)
+    freq_itemsets = [{(item,): len(tidset) for item, tidset in freq_items}]
+    eq_class = [(item, tidset, len(tidset)) for item, tidset in freq_items]
+    _private_eclat([], eq_class, False, min_supp_count, max_len, diffsets, freq_itemsets)
+    return freq_itemsets
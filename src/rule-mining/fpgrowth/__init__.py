@@ -1 +1,4 @@
-from fp_growth import gen_freq_itemsets, gen_freq_itemsets_projected_DB
+from fp_growth import gen_freq_itemsets, gen_freq_itemsets_projected_DB, iter_freq_itemsets
+from array_fptree import ArrayFPTree
+from itemset_trie import ItemsetTrie
+from fptree_snapshot import FPTreeSnapshot
@@ -0,0 +1,174 @@
+"""
+Struct-of-Arrays FP-Tree Implementation using Python.
+Drop-in replacement of fp_growth.FPTree, label, count, parent, first-child / next-sibling and node-link of every node
+are stored in flat typed arrays (indexed by node id) instead of a python object per node, with hashed child look-up
+"""
+
+from array import array
+from fp_growth import FPTree
+
+# marks an absent node (no child / sibling / next node-link) or an empty slot of the child hash table
+_NIL = -1
+# multiplier for hashing (parent node, item id) into the child hash table
+_HASH_MULTIPLIER = 0x9E3779B1
+
+
+class ArrayFPTree(FPTree):
+    """
+    class for Array-backed FP-Tree, all the mining methods of FPTree are inherited (node objects are not available,
+    hence FPTree.remove and FPTreeNode methods do not apply)
+    """
+
+    def __init__(self, null_label=None, labels=None, label_ids=None):
+        """
+        Creates an empty array-backed fp-tree
+        :param null_label: label of root node
+        :param labels: python list, item label of each item id (shared with the conditional fp-trees)
+        :param label_ids: python dictionary, item label (key) and its item id (value), inverse of labels
+        """
+        self.null_label = null_label
+        self.labels = [] if labels is None else labels
+        self.label_ids = dict() if label_ids is None else label_ids
+        # Node arrays (indexed by node id), node 0 is the root
+        self.node_item = array('i', [_NIL])
+        self.node_count = array('q', [0])
+        self.node_parent = array('i', [_NIL])
+        self.node_first_child = array('i', [_NIL])
+        self.node_next_sibling = array('i', [_NIL])
+        # next node with the same item (node-link), _NIL at the end of the chain
+        self.node_link = array('i', [_NIL])
+        self.root = 0
+        # hashed look-up of child node from (parent node, item id), open addressing with linear probing,
+        # slots hold node ids (the key of a node is its (parent, item)), load factor is kept at most 1/2
+        self.child_table = array('i', [_NIL]) * 16
+        # item label -> first node of its node-link chain
+        self.header_table = dict()
+        # items in the order they are inserted along a path from root (if known)
+        self.item_order = None
+
+    def __len__(self):
+        # number of nodes, other than the root
+        return len(self.node_item) - 1
+
+    def _item_id(self, label):
+        item_id = self.label_ids.get(label)
+        if item_id is None:
+            item_id = len(self.labels)
+            self.labels.append(label)
+            self.label_ids[label] = item_id
+        return item_id
+
+    def _grow_child_table(self):
+        capacity = 2 * len(self.child_table)
+        mask = capacity - 1
+        child_table = array('i', [_NIL]) * capacity
+        node_item = self.node_item
+        node_parent = self.node_parent
+        for node in range(1, len(node_item)):
+            slot = ((node_parent[node] * _HASH_MULTIPLIER) ^ node_item[node]) & mask
+            while child_table[slot] != _NIL:
+                slot = (slot + 1) & mask
+            child_table[slot] = node
+        self.child_table = child_table
+
+    def insert(self, transaction, default_count=1):
+        """
+        Inserts transaction into the FP-tree
+        :param transaction: python list, containing all the transactions
+        :param default_count: default count of items to be inserted into the tree from transaction
+        :return: None
+        """
+        node_item = self.node_item
+        node_parent = self.node_parent
+        node_count = self.node_count
+        curr_node = 0
+        for label in transaction:
+            item_id = self._item_id(label)
+            child_table = self.child_table
+            mask = len(child_table) - 1
+            slot = ((curr_node * _HASH_MULTIPLIER) ^ item_id) & mask
+            child = child_table[slot]
+            while child != _NIL and (node_parent[child] != curr_node or node_item[child] != item_id):
+                slot = (slot + 1) & mask
+                child = child_table[slot]
+            if child == _NIL:
+                child = len(node_item)
+                child_table[slot] = child
+                node_item.append(item_id)
+                node_count.append(default_count)
+                node_parent.append(curr_node)
+                self.node_first_child.append(_NIL)
+                # new child is pushed at the front of the children of curr_node
+                self.node_next_sibling.append(self.node_first_child[curr_node])
+                self.node_first_child[curr_node] = child
+                self.node_link.append(self.header_table.get(label, _NIL))
+                self.header_table[label] = child
+                if 2 * len(node_item) > len(child_table):
+                    self._grow_child_table()
+            else:
+                node_count[child] += default_count
+            curr_node = child
+
+    # just for debugging purpose
+    def inorder_print(self):
+        """
+        Print (node id, label, supp_count, parent) of all the nodes of the FP-tree
+        """
+        for node in range(1, len(self.node_item)):
+            print(f'[node : {node}, label : {self.labels[self.node_item[node]]}, '
+                  f'supp_count : {self.node_count[node]}, parent : {self.node_parent[node]}]')
+
+    def conditional_fptree_paths(self, item):
+        """
+        Returns prefix-path subtree containing item as a suffix
+        :param item: int, str (any label)
+        :return: (List[List[label]],List[int]), denotes list of paths and their respective support counts
+        """
+        labels = self.labels
+        node_item = self.node_item
+        node_parent = self.node_parent
+        node_link = self.node_link
+        paths = []
+        supp_counts = []
+        node = self.header_table[item]
+        while node != _NIL:
+            path = []
+            curr_node = node_parent[node]
+            while curr_node != 0:
+                path.append(labels[node_item[curr_node]])
+                curr_node = node_parent[curr_node]
+            paths.append(path)
+            supp_counts.append(self.node_count[node])
+            node = node_link[node]
+        return paths, supp_counts
+
+    def is_single_path(self):
+        """
+        :return: True if the FP-tree is a single path (every node has at most one child)
+        """
+        node = self.node_first_child[0]
+        while node != _NIL:
+            if self.node_next_sibling[node] != _NIL:
+                return False
+            node = self.node_first_child[node]
+        return True
+
+    def single_path(self):
+        """
+        :return: python list of (label, supp_count) of the nodes from root to leaf if the FP-tree is a single path,
+                 otherwise None
+        """
+        path = []
+        node = self.node_first_child[0]
+        while node != _NIL:
+            if self.node_next_sibling[node] != _NIL:
+                return None
+            path.append((self.labels[self.node_item[node]], self.node_count[node]))
+            node = self.node_first_child[node]
+        return path
+
+    def _private_new_fptree(self):
+        """
+        :return: empty ArrayFPTree sharing the item ids of self (for conditional fp-trees)
+        """
+        return ArrayFPTree(self.null_label, self.labels, self.label_ids)
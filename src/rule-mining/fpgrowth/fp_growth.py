@@ -4,7 +4,13 @@ Created on Sun April 1 14:49:37 2022
 Title: FP-Growth, FP-Growth with Projected DBs Implementation using Python.
 """
 
+import heapq
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
 from linkedlist import LinkedList
+from itemset_trie import ItemsetTrie
+from partitioned_db import PartitionedDB
 
 
 class FPTreeNode:
@@ -49,6 +55,112 @@ class FPTreeNode:
         return f'[label : {self.label}, supp_count : {self.supp_count}]'
 
 
+class _FreqItemsets(dict):
+    """
+    class for collecting all the frequent itemsets at a fixed support count threshold, as a python dictionary
+    with itemsets (python tuples, items in sorted order) as keys and their support counts as values
+    """
+
+    def __init__(self, min_supp_count):
+        super().__init__()
+        self.min_supp_count = min_supp_count
+
+    def add(self, itemset, supp_count):
+        self[tuple(sorted(itemset))] = supp_count
+
+
+class _TopKItemsets:
+    """
+    class for collecting the k most frequent itemsets in a bounded min-heap, support count threshold rises to
+    the support count of the k-th best itemset found so far, once k itemsets are found
+    """
+
+    def __init__(self, k, min_supp_count):
+        self.k = k
+        self.min_supp_count = min_supp_count
+        # heap of (supp_count, -order of discovery, itemset), ties are resolved in favour of the earlier found itemset
+        # (the latest found of the itemsets with the least support count is at the top, and is evicted first)
+        self.heap = []
+        self.n_found = 0
+
+    def add(self, itemset, supp_count):
+        if supp_count < self.min_supp_count:
+            return
+        entry = (supp_count, -self.n_found, itemset)
+        self.n_found += 1
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        else:
+            heapq.heapreplace(self.heap, entry)
+        if len(self.heap) == self.k:
+            # only itemsets with support count more than that of the k-th best one can enter the heap
+            self.min_supp_count = max(self.min_supp_count, self.heap[0][0] + 1)
+
+    def itemsets(self):
+        """
+        :return: python dictionary of the itemsets (python tuples, items in sorted order) and their support counts,
+                 in decreasing order of support counts
+        """
+        return {tuple(sorted(itemset)): supp_count
+                for supp_count, _, itemset in sorted(self.heap, key=lambda entry: (-entry[0], -entry[1]))}
+
+
+class _ClosedItemsets(_FreqItemsets):
+    """
+    class for collecting the closed frequent itemsets, i.e. those without any superset of the same support count
+    """
+
+    def __init__(self, min_supp_count):
+        super().__init__(min_supp_count)
+        # (supp_count, item) -> python list of closed itemsets (frozensets) with supp_count, containing item
+        self.index = dict()
+
+    def is_subsumed(self, itemset, supp_count):
+        """
+        :return: True if a closed itemset found so far is a superset of itemset with the same support count
+        """
+        candidates = min((self.index.get((supp_count, item), ()) for item in itemset), key=len)
+        itemset = set(itemset)
+        for closed_itemset in candidates:
+            if itemset <= closed_itemset:
+                return True
+        return False
+
+    def add(self, itemset, supp_count):
+        super().add(itemset, supp_count)
+        closed_itemset = frozenset(itemset)
+        for item in itemset:
+            self.index.setdefault((supp_count, item), []).append(closed_itemset)
+
+
+class _MaximalItemsets(_FreqItemsets):
+    """
+    class for collecting the maximal frequent itemsets, i.e. those without any frequent superset
+    """
+
+    def __init__(self, min_supp_count):
+        super().__init__(min_supp_count)
+        # item -> python list of maximal itemsets (frozensets) containing item
+        self.index = dict()
+
+    def is_subsumed(self, itemset):
+        """
+        :return: True if a maximal itemset found so far is a superset of itemset
+        """
+        candidates = min((self.index.get(item, ()) for item in itemset), key=len)
+        itemset = set(itemset)
+        for maximal_itemset in candidates:
+            if itemset <= maximal_itemset:
+                return True
+        return False
+
+    def add(self, itemset, supp_count):
+        super().add(itemset, supp_count)
+        maximal_itemset = frozenset(itemset)
+        for item in itemset:
+            self.index.setdefault(item, []).append(maximal_itemset)
+
+
 class FPTree:
     """
     class for FP-Tree
@@ -61,6 +173,9 @@ class FPTree:
         self.root = FPTreeNode(label=null_label, supp_count=0)
         # list containing additional pointers for each new item added to the FP-tree
         self.header_table = dict()
+        # items in the order they are inserted along a path from root (if known), i.e. ancestors of a node always
+        # come before it in item_order
+        self.item_order = None
 
     def insert(self, transaction, default_count=1):
         """
@@ -131,81 +246,442 @@ class FPTree:
             supp_counts.append(node.val.supp_count)
         return paths, supp_counts
 
-    def _private_gen_freq_itemsets(self, suffix_itemset, freq_item, min_supp_count, freq_itemsets):
+    def is_single_path(self):
+        """
+        :return: True if the FP-tree is a single path (every node has at most one child)
+        """
+        curr_node = self.root
+        while curr_node.children:
+            if len(curr_node.children) > 1:
+                return False
+            curr_node = curr_node.children[0]
+        return True
+
+    def single_path(self):
         """
-        Generates frequent itemsets with suffix of the itemset : suffix_itemset, from FP-tree : self
+        :return: python list of (label, supp_count) of the nodes from root to leaf if the FP-tree is a single path,
+                 otherwise None
+        """
+        path = []
+        curr_node = self.root
+        while curr_node.children:
+            if len(curr_node.children) > 1:
+                return None
+            curr_node = curr_node.children[0]
+            path.append((curr_node.label, curr_node.supp_count))
+        return path
+
+    def _private_new_fptree(self):
+        """
+        :return: empty FP-tree of the same kind as self (for conditional fp-trees)
+        """
+        return FPTree(self.null_label)
+
+    def _private_conditional_fptree(self, paths, supp_counts, min_supp_count):
+        """
+        Constructs conditional fp-tree from the prefix paths of an item, with only the frequent items
+        Support counts of the items are counted from the paths first, and only the frequent items of each path are
+        inserted, in decreasing order of their support counts in the conditional fp-tree
+        :param paths: List[List[label]], prefix paths (output of conditional_fptree_paths)
+        :param supp_counts: List[int], support counts of the paths
+        :param min_supp_count: int, minimum support count threshold
+        :return: (FPTree, python dictionary), conditional fp-tree and support counts of its items
+        """
+        item_supp_counts = dict()
+        for path, supp_count in zip(paths, supp_counts):
+            for item in path:
+                if item in item_supp_counts:
+                    item_supp_counts[item] += supp_count
+                else:
+                    item_supp_counts[item] = supp_count
+        # ties are broken by the order of items in self (paths are from leaf to root)
+        if self.item_order is not None:
+            parent_rank = {item: idx for idx, item in enumerate(self.item_order)}
+        else:
+            parent_rank = {item: idx for idx, item in enumerate(item_supp_counts)}
+        item_order = sorted((item for item, supp_count in item_supp_counts.items() if supp_count >= min_supp_count),
+                            key=lambda x: (-item_supp_counts[x], parent_rank[x]))
+        item_supp_counts = {item: item_supp_counts[item] for item in item_order}
+        rank = {item: idx for idx, item in enumerate(item_order)}
+
+        conditional_fptree = self._private_new_fptree()
+        conditional_fptree.item_order = item_order
+        for path, supp_count in zip(paths, supp_counts):
+            _path = [item for item in path if item in rank]
+            if _path:
+                _path.sort(key=lambda x: rank[x])
+                conditional_fptree.insert(_path, supp_count)
+        return conditional_fptree, item_supp_counts
+
+    def _private_iter_freq_itemsets(self, suffix_itemset, freq_items, freq_itemsets, min_len=1, max_len=None,
+                                    must_contain=None, has_required=True):
+        """
+        Generates frequent itemsets with suffix of the itemset : suffix_itemset, from FP-tree : self, depth-first
+        with an explicit stack of (fp-tree, suffix, item) instead of recursion, hence conditional fp-trees are kept
+        only along the current branch, and itemsets are yielded as soon as they are found
         :param suffix_itemset: list of item labels, suffix of the itemset considered thus far
+        :param freq_items: list of item labels, we construct conditional fp-tree for [freq_item, *suffix_itemset]
+                           for each of them
+        :param freq_itemsets: collector of frequent itemsets (_FreqItemsets or _TopKItemsets), its min_supp_count
+                              is read as the (current) minimum support count threshold, itemsets are not added to it
+        :param min_len: int, minimum length of the itemsets generated
+        :param max_len: int, maximum length of the itemsets generated, None for no limit
+        :param must_contain: python set of items, generated itemsets must contain at least one of them, None for any
+        :param has_required: bool, True if suffix_itemset contains an item of must_contain (or it is None)
+        :return: generator of (itemset (python list of item labels), supp_count)
+        """
+        stack = [(self, suffix_itemset, freq_item, has_required) for freq_item in reversed(freq_items)]
+        while stack:
+            fptree, suffix_itemset, freq_item, has_required = stack.pop()
+            paths, supp_counts = fptree.conditional_fptree_paths(freq_item)
+            # support count threshold may have risen (top-k mining) since freq_item was found frequent
+            supp_count = sum(supp_counts)
+            if supp_count < freq_itemsets.min_supp_count:
+                continue
+            itemset = [freq_item, *suffix_itemset]
+            has_required = has_required or freq_item in must_contain
+            # declare [freq_item, *suffix_itemset] as frequent
+            if has_required and len(itemset) >= min_len:
+                yield itemset, supp_count
+            # conditional fp-trees are not constructed for branches where no itemset can satisfy the constraints
+            if max_len is not None and len(itemset) >= max_len:
+                continue
+            if not has_required and not any(item in must_contain for path in paths for item in path):
+                continue
+
+            # construct conditional fp-tree of [freq_item, *suffix_itemset]
+            conditional_fptree, _ = fptree._private_conditional_fptree(paths, supp_counts,
+                                                                       freq_itemsets.min_supp_count)
+            del paths, supp_counts
+
+            path = conditional_fptree.single_path()
+            if path is not None:
+                # single prefix path : every combination of its items along with itemset is frequent, support count
+                # of a combination is that of its deepest node, no further conditional fp-trees are needed
+                max_r = len(path) if max_len is None else min(len(path), max_len - len(itemset))
+                for r in range(max(1, min_len - len(itemset)), max_r + 1):
+                    for combination in itertools.combinations(path, r):
+                        supp_count = combination[-1][1]
+                        if supp_count < freq_itemsets.min_supp_count:
+                            continue
+                        if has_required or any(item in must_contain for item, _ in combination):
+                            yield [*(item for item, _ in combination), *itemset], supp_count
+                continue
+
+            # all the frequent items, given conditional_fptree of itemset as [freq_items, *itemset], are mined in
+            # the order of its header table (pushed in reverse)
+            for item in reversed(list(conditional_fptree.header_table)):
+                stack.append((conditional_fptree, itemset, item, has_required))
+
+    def _private_gen_closed_itemsets(self, suffix_itemset, freq_item, closed_itemsets):
+        """
+        Generates closed frequent itemsets with suffix of the itemset : suffix_itemset, from FP-tree : self
+        (items of the fp-tree must be mined in reverse of its item_order, i.e. from the bottom)
+        :param suffix_itemset: list of item labels, suffix of the itemset considered thus far (with merged items)
         :param freq_item: item label, we construct conditional fp-tree for [freq_item, *suffix_itemset]
-        :param min_supp_count: int, minimum support count threshold
+        :param closed_itemsets: _ClosedItemsets, collector of closed frequent itemsets
         :return: None
         """
-        # declare [freq_item, *suffix_itemset] as frequent
-        freq_itemsets.append([freq_item, *suffix_itemset])
-
-        # construct conditional fp-tree of [freq_item, *suffix_itemset]
         paths, supp_counts = self.conditional_fptree_paths(freq_item)
-        conditional_fptree = FPTree(self.null_label)
-        n = len(paths)
-        for i in range(n):
-            FPTree.insert(conditional_fptree, reversed(paths[i]), supp_counts[i])
-        # delete all those items that are now infrequent
-        to_delete = []
-        for item, head_list in conditional_fptree.header_table.items():
-            supp_count = 0
-            for list_node in head_list:
-                supp_count += list_node.val.supp_count
-            if supp_count < min_supp_count:
-                for list_node in head_list:
-                    FPTree.remove(list_node.val)
-                to_delete.append(item)
-        for item in to_delete:
-            del conditional_fptree.header_table[item]
-        # conditional_fptree is conditional fp-tree for [freq_items[k], *suffix_itemset]
-
-        freq_items = []
-        for item in conditional_fptree.header_table:
-            freq_items.append(item)
-        m_ = len(freq_items)
-        # freq_items contains all the frequent items, given conditional_fptree of suffix_itemset as
-        # [freq_items, *suffix_itemset]
-        for j in range(m_):
-            conditional_fptree._private_gen_freq_itemsets([freq_item, *suffix_itemset],
-                                                          freq_items[j],
-                                                          min_supp_count,
-                                                          freq_itemsets)
-
-    def gen_freq_itemsets_fp(self, freq_items, min_supp_count, suffix=None):
+        supp_count = sum(supp_counts)
+        conditional_fptree, item_supp_counts = self._private_conditional_fptree(paths, supp_counts,
+                                                                                closed_itemsets.min_supp_count)
+        # item merging : items occurring in every transaction containing [freq_item, *suffix_itemset] belong to
+        # all of its closed supersets, these are merged into the itemset instead of being branched upon
+        in_suffix = set(suffix_itemset)
+        merged_items = [item for item, item_supp_count in item_supp_counts.items()
+                        if item_supp_count == supp_count and item not in in_suffix]
+        itemset = [*merged_items, freq_item, *suffix_itemset]
+        # sub-itemset pruning : if a closed itemset found earlier subsumes itemset, it subsumes the whole branch
+        if closed_itemsets.is_subsumed(itemset, supp_count):
+            return
+        closed_itemsets.add(itemset, supp_count)
+        in_suffix.update(merged_items)
+        for item in reversed(conditional_fptree.item_order):
+            if item not in in_suffix:
+                conditional_fptree._private_gen_closed_itemsets(itemset, item, closed_itemsets)
+
+    def _private_gen_maximal_itemsets(self, suffix_itemset, freq_item, maximal_itemsets):
+        """
+        Generates maximal frequent itemsets with suffix of the itemset : suffix_itemset, from FP-tree : self
+        (items of the fp-tree must be mined in reverse of its item_order, i.e. from the bottom)
+        :param suffix_itemset: list of item labels, suffix of the itemset considered thus far
+        :param freq_item: item label, we construct conditional fp-tree for [freq_item, *suffix_itemset]
+        :param maximal_itemsets: _MaximalItemsets, collector of maximal frequent itemsets
+        :return: None
+        """
+        head = [freq_item, *suffix_itemset]
+        paths, supp_counts = self.conditional_fptree_paths(freq_item)
+        conditional_fptree, item_supp_counts = self._private_conditional_fptree(paths, supp_counts,
+                                                                                maximal_itemsets.min_supp_count)
+        # look-ahead pruning : if head along with all of its frequent extension items is subsumed by a maximal
+        # itemset found earlier, so is every itemset of this branch
+        itemset = [*item_supp_counts, *head]
+        if maximal_itemsets.is_subsumed(itemset):
+            return
+        if conditional_fptree.is_single_path():
+            # all the items of a single path occur together, hence head with all of them is frequent
+            maximal_itemsets.add(itemset, min(item_supp_counts.values(), default=sum(supp_counts)))
+            return
+        for item in reversed(conditional_fptree.item_order):
+            conditional_fptree._private_gen_maximal_itemsets(head, item, maximal_itemsets)
+
+    def gen_freq_itemsets_fp(self, freq_items, min_supp_count, suffix=None, top_k=None, closed=False,
+                             maximal=False, min_len=1, max_len=None, must_contain=None):
         """
         Generates frequent itemsets from FP-tree
+        :param freq_items: list of item labels, in any order (decreasing order of support counts is the fastest
+                           for top_k)
+        :param min_supp_count: int, minimum support count threshold
+        :param suffix: suffix for the conditional fp-tree : self
+        :param top_k: int, if given only the top_k most frequent itemsets are generated
+        :param closed: bool, if True only the closed frequent itemsets are generated (freq_items must be in
+                       reverse of self.item_order)
+        :param maximal: bool, if True only the maximal frequent itemsets are generated (freq_items must be in
+                        reverse of self.item_order)
+        :param min_len: int, minimum length of the itemsets generated (including suffix)
+        :param max_len: int, maximum length of the itemsets generated (including suffix), None for no limit
+        :param must_contain: python set of items, generated itemsets must contain at least one of them, None for any
+        :return: python dictionary of frequent itemsets (python tuples, items in sorted order) (key), along with
+                 their support counts (value) (in decreasing order of support counts for top_k)
+        """
+        suffix = [] if suffix is None else suffix
+        if closed:
+            freq_itemsets = _ClosedItemsets(min_supp_count)
+            for item in freq_items:
+                self._private_gen_closed_itemsets(suffix, item, freq_itemsets)
+            return dict(freq_itemsets)
+        if maximal:
+            freq_itemsets = _MaximalItemsets(min_supp_count)
+            for item in freq_items:
+                self._private_gen_maximal_itemsets(suffix, item, freq_itemsets)
+            return dict(freq_itemsets)
+        if top_k is None:
+            freq_itemsets = _FreqItemsets(min_supp_count)
+        else:
+            freq_itemsets = _TopKItemsets(top_k, min_supp_count)
+        has_required = must_contain is None or any(item in must_contain for item in suffix)
+        for itemset, supp_count in self._private_iter_freq_itemsets(suffix, freq_items, freq_itemsets, min_len,
+                                                                    max_len, must_contain, has_required):
+            freq_itemsets.add(itemset, supp_count)
+        if top_k is None:
+            return dict(freq_itemsets)
+        return freq_itemsets.itemsets()
+
+    def iter_freq_itemsets_fp(self, freq_items, min_supp_count, suffix=None, min_len=1, max_len=None,
+                              must_contain=None):
+        """
+        Generates frequent itemsets from FP-tree lazily, without recursion and without keeping the itemsets found
         :param freq_items: list of item labels, in any order
         :param min_supp_count: int, minimum support count threshold
         :param suffix: suffix for the conditional fp-tree : self
-        :return: List of all frequent itemsets
+        :param min_len: int, minimum length of the itemsets generated (including suffix)
+        :param max_len: int, maximum length of the itemsets generated (including suffix), None for no limit
+        :param must_contain: python set of items, generated itemsets must contain at least one of them, None for any
+        :return: generator of (frequent itemset (python tuple, items in sorted order), supp_count)
         """
         suffix = [] if suffix is None else suffix
-        freq_itemsets = []
-        for item in freq_items:
-            self._private_gen_freq_itemsets(suffix, item, min_supp_count, freq_itemsets)
-        return freq_itemsets
+        has_required = must_contain is None or any(item in must_contain for item in suffix)
+        # threshold is fixed, nothing is ever added to the collector
+        threshold = _FreqItemsets(min_supp_count)
+        for itemset, supp_count in self._private_iter_freq_itemsets(suffix, freq_items, threshold, min_len, max_len,
+                                                                    must_contain, has_required):
+            yield tuple(sorted(itemset)), supp_count
 
 
-def gen_freq_itemsets(transactions, null_label=None, min_sup=0.5):
+def _private_fptree_class(backend):
+    """
+    Returns the FP-tree class for backend, "fptree" (FPTree) or "array_fptree" (ArrayFPTree)
+    """
+    if backend == "fptree":
+        return FPTree
+    if backend == "array_fptree":
+        # imported here, since array_fptree module extends FPTree
+        from array_fptree import ArrayFPTree
+        return ArrayFPTree
+    raise ValueError(f'Unknown backend : {backend}, expected "fptree" or "array_fptree"')
+
+
+def _private_result(freq_itemsets, result):
+    """
+    Returns the frequent itemsets (python dictionary) in the result container : "dict" or "trie" (ItemsetTrie)
+    """
+    if result == "trie":
+        return ItemsetTrie.from_itemsets(freq_itemsets)
+    return freq_itemsets
+
+
+def _private_check_result(result):
+    if result not in ("dict", "trie"):
+        raise ValueError(f'Unknown result : {result}, expected "dict" or "trie"')
+
+
+def _private_check_modes(top_k, closed, maximal, min_len, max_len, must_contain):
+    if top_k is not None and top_k <= 0:
+        raise ValueError(f'top_k must be a positive integer, got {top_k}')
+    if closed + maximal + (top_k is not None) > 1:
+        raise ValueError('Only one of top_k, closed and maximal can be given')
+    if (closed or maximal) and (min_len > 1 or max_len is not None or must_contain is not None):
+        raise ValueError('min_len, max_len and must_contain are not supported for closed or maximal itemsets')
+
+
+def _private_count_items(transactions):
+    """
+    First scan of the data-base to get the support counts of individual items
+    :return: python dictionary, item (key) and its support count (value)
+    """
+    item_supp_counts = dict()
+    for _, t in transactions.items():
+        for item in t:
+            if item in item_supp_counts:
+                item_supp_counts[item] += 1
+            else:
+                item_supp_counts[item] = 1
+    return item_supp_counts
+
+
+def _private_remove_excluded_items(item_supp_counts, must_contain, must_not_contain, antecedent_items):
+    """
+    Removes the items which cannot occur in any itemset due to the item constraints, from item_supp_counts
+    :return: None
+    """
+    must_not_contain = set() if must_not_contain is None else set(must_not_contain)
+    antecedent_items = None if antecedent_items is None else set(antecedent_items)
+    excluded_items = []
+    for item in item_supp_counts:
+        if item in must_not_contain:
+            excluded_items.append(item)
+        elif antecedent_items is not None and item not in antecedent_items and \
+                (must_contain is None or item not in must_contain):
+            excluded_items.append(item)
+    for item in excluded_items:
+        del item_supp_counts[item]
+
+
+def _private_build_fptree(transactions, freq_one_itemsets, fptree_class, null_label=None):
+    """
+    Constructs FP-tree of the frequent items of the transactions (second scan of the data-base)
+    :param freq_one_itemsets: python dictionary, frequent item (key) and its support count (value)
+    :return: FP-tree (of class fptree_class), with its item_order
+    """
+    rank_encoded = getattr(transactions, 'rank_encoded', False)
+    if rank_encoded:
+        # items are dense ids in decreasing order of support count (encoding.ItemEncoder), and every transaction
+        # is sorted by item id, hence no transaction needs to be sorted
+        item_order = sorted(freq_one_itemsets)
+    else:
+        # items in decreasing order of support count, ties are broken by order of their first occurrence so that
+        # all the transactions are inserted in the same order
+        item_order = sorted(freq_one_itemsets, key=lambda x: freq_one_itemsets[x], reverse=True)
+    rank = {item: idx for idx, item in enumerate(item_order)}
+    fp_tree = fptree_class(null_label=null_label)
+    fp_tree.item_order = item_order
+    for _, transaction in transactions.items():
+        _transaction = [item for item in transaction if item in freq_one_itemsets]
+        # _transaction must be in decreasing order of support count
+        if not rank_encoded:
+            _transaction = sorted(_transaction, key=lambda x: rank[x])
+        fp_tree.insert(_transaction)
+    return fp_tree
+
+
+def gen_freq_itemsets(transactions, null_label=None, min_sup=None, top_k=None, closed=False, maximal=False,
+                      min_len=1, max_len=None, must_contain=None, must_not_contain=None, antecedent_items=None,
+                      backend="fptree", result="dict"):
     """
     Generates frequent itemsets, using standard FP-growth algorithm (using FP-tree)
     :param transactions: python dictionary, transaction IDs (keys), contains list of transactions(value)
+                         (or a TransactionDB)
+    :param null_label: label of root node (generally should be something i.e. a label of any item)
+    :param min_sup: minimum support threshold, if None 0.5 (no threshold for top_k)
+    :param top_k: int, if given only the top_k most frequent itemsets are generated, without guessing min_sup,
+                  support count threshold rises as the itemsets are found and infrequent branches are pruned
+                  (min_sup, if given, is the lower bound of the threshold)
+    :param closed: bool, if True only the closed frequent itemsets (no superset with the same support count) are
+                   generated, with item merging and sub-itemset pruning during the search (FPClose / CLOSET+)
+    :param maximal: bool, if True only the maximal frequent itemsets (no frequent superset) are generated, with
+                    look-ahead pruning and single path shortcut during the search (FPMax)
+    :param min_len: int, minimum length of the itemsets generated
+    :param max_len: int, maximum length of the itemsets generated, None for no limit
+    :param must_contain: iterable of items, generated itemsets must contain at least one of them
+    :param must_not_contain: iterable of items, generated itemsets must not contain any of them
+    :param antecedent_items: iterable of items, universe of items of the generated itemsets (items of must_contain
+                             are always allowed), i.e. rules generated from them have antecedents from this universe
+    :param backend: "fptree" (FPTree, a python object per node) or "array_fptree" (ArrayFPTree, nodes stored in
+                    typed arrays, much smaller in memory)
+    :param result: "dict" or "trie", container of the frequent itemsets returned
+    :return: python dictionary of frequent itemsets (python tuples, items in sorted order) (key), along with their
+             support counts (value), or an ItemsetTrie of the same (for result="trie"), either can be passed to
+             gen_rules (of all frequent itemsets) directly
+    """
+    fptree_class = _private_fptree_class(backend)
+    _private_check_result(result)
+    _private_check_modes(top_k, closed, maximal, min_len, max_len, must_contain)
+    if min_sup is None:
+        min_sup = 0.5 if top_k is None else 0
+    must_contain = None if must_contain is None else set(must_contain)
+    n = len(transactions)
+    # First scan of the data-base to get the support counts of individual items
+    freq_one_itemsets = _private_count_items(transactions)
+    # excluded items are dropped right away, hence never inserted into any fp-tree
+    _private_remove_excluded_items(freq_one_itemsets, must_contain, must_not_contain, antecedent_items)
+    min_supp_count = min_sup * n
+    if top_k is not None and len(freq_one_itemsets) >= top_k and min_len <= 1 and must_contain is None:
+        # top_k items are frequent itemsets themselves, hence support count of the top_k-th itemset is at least
+        # that of the top_k-th item
+        min_supp_count = max(min_supp_count, sorted(freq_one_itemsets.values(), reverse=True)[top_k - 1])
+    infrequent_items = []
+    for item, sup_count in freq_one_itemsets.items():
+        if sup_count < min_supp_count:
+            infrequent_items.append(item)
+    for item in infrequent_items:
+        del freq_one_itemsets[item]
+
+    # freq_one_itemsets contains (key=item, value=supp_count) pairs, with only frequent items
+
+    fp_tree = _private_build_fptree(transactions, freq_one_itemsets, fptree_class, null_label)
+    item_order = fp_tree.item_order
+
+    if closed or maximal:
+        # items are mined from the bottom of the fp-tree, so that supersets are always found before subsets
+        freq_items = item_order[::-1]
+    elif top_k is not None:
+        # most frequent items first, so that the threshold rises quickly
+        freq_items = item_order
+    else:
+        freq_items = list(freq_one_itemsets.keys())
+    freq_itemsets = fp_tree.gen_freq_itemsets_fp(freq_items, min_supp_count=min_supp_count, top_k=top_k,
+                                                 closed=closed, maximal=maximal, min_len=min_len, max_len=max_len,
+                                                 must_contain=must_contain)
+    return _private_result(freq_itemsets, result)
+
+
+def iter_freq_itemsets(transactions, null_label=None, min_sup=0.5, min_len=1, max_len=None, must_contain=None,
+                       must_not_contain=None, antecedent_items=None, backend="fptree"):
+    """
+    Generates frequent itemsets lazily, using standard FP-growth algorithm (using FP-tree), itemsets are yielded as
+    soon as they are found (mining is driven by an explicit stack, hence has no recursion limit), and are not kept,
+    so that they can be streamed (for ex. to disk) with constant memory for the output
+    :param transactions: python dictionary, transaction IDs (keys), contains list of transactions(value)
+                         (or a TransactionDB)
     :param null_label: label of root node (generally should be something i.e. a label of any item)
     :param min_sup: minimum support threshold
-    :return: python dictionary of frequent itemsets (key), along with their support counts(value)
+    :param min_len: int, minimum length of the itemsets generated
+    :param max_len: int, maximum length of the itemsets generated, None for no limit
+    :param must_contain: iterable of items, generated itemsets must contain at least one of them
+    :param must_not_contain: iterable of items, generated itemsets must not contain any of them
+    :param antecedent_items: iterable of items, universe of items of the generated itemsets (items of must_contain
+                             are always allowed)
+    :param backend: "fptree" (FPTree) or "array_fptree" (ArrayFPTree)
+    :return: generator of (frequent itemset (python tuple, items in sorted order), supp_count), same itemsets as
+             gen_freq_itemsets
     """
+    fptree_class = _private_fptree_class(backend)
+    must_contain = None if must_contain is None else set(must_contain)
     n = len(transactions)
-    freq_one_itemsets = dict()
     # First scan of the data-base to get the support counts of individual items
-    for _, t in transactions.items():
-        for item in t:
-            if item in freq_one_itemsets:
-                freq_one_itemsets[item] += 1
-            else:
-                freq_one_itemsets[item] = 1
+    freq_one_itemsets = _private_count_items(transactions)
+    _private_remove_excluded_items(freq_one_itemsets, must_contain, must_not_contain, antecedent_items)
     infrequent_items = []
     for item, sup_count in freq_one_itemsets.items():
         if sup_count < n * min_sup:
@@ -213,39 +689,237 @@ def gen_freq_itemsets(transactions, null_label=None, min_sup=0.5):
     for item in infrequent_items:
         del freq_one_itemsets[item]
 
-    # freq_one_itemsets contains (key=item, value=supp_count) pairs, with only frequent items
+    fp_tree = _private_build_fptree(transactions, freq_one_itemsets, fptree_class, null_label)
+    yield from fp_tree.iter_freq_itemsets_fp(list(freq_one_itemsets.keys()), min_supp_count=min_sup * n,
+                                             min_len=min_len, max_len=max_len, must_contain=must_contain)
 
-    fp_tree = FPTree(null_label=null_label)
-    # Second scan of the data-base to construct FP-tree
-    for _, transaction in transactions.items():
-        _transaction = [item for item in transaction if item in freq_one_itemsets]
-        # _transaction must be in decreasing order of support count
-        _transaction = sorted(_transaction, key=lambda x: freq_one_itemsets[x], reverse=True)
-        fp_tree.insert(_transaction)
 
-    # freq_items are inserted in increasing order of support counts
-    return fp_tree.gen_freq_itemsets_fp(list(freq_one_itemsets.keys()),
-                                        min_supp_count=min_sup * n)
+def _private_projection_needed(item, rank, max_len=None, must_contain=None):
+    """
+    :return: False if no itemset of the item-projected database of item (other than item itself) can satisfy the
+             constraints, hence the projected database need not be mined
+    """
+    if max_len is not None and max_len <= 1:
+        return False
+    if must_contain is not None and item not in must_contain and \
+            not any(item_ in rank and rank[item_] < rank[item] for item_ in must_contain):
+        return False
+    return True
+
+
+def _private_mine_projected_DB(item, projected_DB, rank, min_supp_count, null_label, fptree_class, min_len=1,
+                               max_len=None, must_contain=None):
+    """
+    Mines the item-projected database of item, by constructing its item-conditional fp-tree
+    :param projected_DB: python list of transactions (python lists of frequent items ranked before item) containing item
+    :return: python dictionary of frequent itemsets containing item (other than (item,)) along with their support counts
+    """
+    projected_DB_freq_items = dict()
+    for t in projected_DB:
+        for _item in t:
+            if _item in projected_DB_freq_items:
+                projected_DB_freq_items[_item] += 1
+            else:
+                projected_DB_freq_items[_item] = 1
+    _infrequent_items = []
+    for _item, sup_count in projected_DB_freq_items.items():
+        if sup_count < min_supp_count:
+            _infrequent_items.append(_item)
+    for _item in _infrequent_items:
+        del projected_DB_freq_items[_item]
+
+    conditional_fp_tree = fptree_class(null_label=null_label)
+    conditional_fp_tree.item_order = sorted(projected_DB_freq_items,
+                                            key=lambda x: (-projected_DB_freq_items[x], rank[x]))
+    _rank = {_item: idx for idx, _item in enumerate(conditional_fp_tree.item_order)}
+
+    # Second scan of the database to construct FP-tree
+    for transaction in projected_DB:
+        # _transaction must be in decreasing order of support count
+        _transaction = [_item for _item in transaction if _item in projected_DB_freq_items]
+        _transaction = sorted(_transaction, key=lambda x: _rank[x])
+        conditional_fp_tree.insert(_transaction)
+    # collect all the frequent itemsets from item-conditional fp-tree
+    return conditional_fp_tree.gen_freq_itemsets_fp(projected_DB_freq_items,
+                                                    min_supp_count=min_supp_count,
+                                                    suffix=[item],
+                                                    min_len=min_len,
+                                                    max_len=max_len,
+                                                    must_contain=must_contain)
+
+
+def _private_mine_projected_DBs(transactions, items, freq_one_itemsets, rank, min_supp_count, null_label, backend,
+                                min_len=1, max_len=None, must_contain=None):
+    """
+    Mines the item-projected databases of the given items, i.e. all the frequent itemsets whose last item (in
+    decreasing order of support count) is one of items, projected database of an item is constructed by a scan of
+    all the transactions
+    :param transactions: python dictionary, transaction IDs (keys), contains list of transactions(value) (or a
+                         TransactionDB), every transaction containing any of items must be present, along with all of
+                         its items ranked before that item
+    :param items: python list, frequent items whose projected databases are mined
+    :param freq_one_itemsets: python dictionary, frequent item (key) and its support count (value)
+    :param rank: python dictionary, frequent item (key) and its rank (value) in decreasing order of support count
+    :param min_supp_count: minimum support count
+    :return: python dictionary, item (key) and python dictionary of frequent itemsets of its projected database along
+             with their support counts (value)
+    """
+    fptree_class = _private_fptree_class(backend)
+    item_itemsets = dict()
+    for item in items:
+        frequent_itemsets = dict()
+        item_itemsets[item] = frequent_itemsets
+        if min_len <= 1 and (must_contain is None or item in must_contain):
+            frequent_itemsets[(item,)] = freq_one_itemsets[item]
+        # projected databases are not constructed where no itemset can satisfy the constraints
+        if not _private_projection_needed(item, rank, max_len, must_contain):
+            continue
+        # construct projected database
+        projected_DB = [[item_ for item_ in transaction
+                         if item_ in freq_one_itemsets
+                         and rank[item_] < rank[item]]
+                        for _, transaction in transactions.items() if item in transaction]
+        # Note: If we are assured that transaction width is not too large (bounded above by a constant) then
+        # membership test can be considered O(1)
+        frequent_itemsets.update(_private_mine_projected_DB(item, projected_DB, rank, min_supp_count, null_label,
+                                                            fptree_class, min_len, max_len, must_contain))
+    return item_itemsets
 
 
-def gen_freq_itemsets_projected_DB(transactions, null_label=None, min_sup=0.5):
+def _private_mine_partitioned_DBs(transactions, items, freq_one_itemsets, rank, min_supp_count, null_label, backend,
+                                  min_len=1, max_len=None, must_contain=None, memory_budget=None, temp_dir=None):
+    """
+    Same as _private_mine_projected_DBs, but the database is partitioned into the item-projected databases in a
+    single sequential scan (partition projection), a transaction is put into the partition of its last frequent
+    item only, and once that item is mined, the transaction (without it) moves on to the partition of its next item,
+    hence the partitions together never hold more than the database itself, partitions over memory_budget (bytes) are
+    spilled to temporary binary files (in temp_dir), and are read back one at a time
+    :return: python dictionary, item (key) and python dictionary of frequent itemsets of its projected database along
+             with their support counts (value)
+    """
+    fptree_class = _private_fptree_class(backend)
+    items = set(items)
+    # items are stored in the partitions as their ranks
+    items_by_rank = sorted(rank, key=lambda x: rank[x])
+    item_itemsets = dict()
+    with PartitionedDB(len(items_by_rank), memory_budget, temp_dir) as partitions:
+        for _, transaction in transactions.items():
+            t = sorted(rank[item] for item in transaction if item in rank)
+            if len(t) > 1:
+                partitions.add(t[-1], t[:-1])
+        # items are mined from the least frequent one, so that partitions only move towards unmined items
+        for item_rank in range(len(items_by_rank) - 1, -1, -1):
+            item = items_by_rank[item_rank]
+            partition = partitions.pop(item_rank)
+            for t in partition:
+                if len(t) > 1:
+                    partitions.add(t[-1], t[:-1])
+            if item not in items:
+                continue
+            frequent_itemsets = dict()
+            item_itemsets[item] = frequent_itemsets
+            if min_len <= 1 and (must_contain is None or item in must_contain):
+                frequent_itemsets[(item,)] = freq_one_itemsets[item]
+            if not _private_projection_needed(item, rank, max_len, must_contain):
+                continue
+            projected_DB = [[items_by_rank[item_rank_] for item_rank_ in t] for t in partition]
+            del partition
+            frequent_itemsets.update(_private_mine_projected_DB(item, projected_DB, rank, min_supp_count, null_label,
+                                                                fptree_class, min_len, max_len, must_contain))
+    return item_itemsets
+
+
+def _private_balanced_item_groups(freq_one_itemsets, rank, n, n_groups):
+    """
+    Splits the frequent items into n_groups groups of about the same total estimated projected database size
+    (greedily, largest first), size of the projected database of an item is estimated (assuming items occur
+    independently) as its support count times the expected number of items before it in a transaction
+    :return: python list of groups (python lists of items, in order of rank)
+    """
+    items = sorted(freq_one_itemsets, key=lambda x: rank[x])
+    estimated_sizes = dict()
+    items_before = 0
+    for item in items:
+        estimated_sizes[item] = freq_one_itemsets[item] * (1 + items_before)
+        items_before += freq_one_itemsets[item] / n
+    n_groups = max(1, min(n_groups, len(items)))
+    # heap of (total estimated size, group index)
+    loads = [(0, idx) for idx in range(n_groups)]
+    groups = [[] for _ in range(n_groups)]
+    for item in sorted(items, key=lambda x: estimated_sizes[x], reverse=True):
+        load, idx = heapq.heappop(loads)
+        groups[idx].append(item)
+        heapq.heappush(loads, (load + estimated_sizes[item], idx))
+    return [sorted(group, key=lambda x: rank[x]) for group in groups if group]
+
+
+def _private_group_shards(transactions, groups, rank):
+    """
+    Builds the group-dependent shard of transactions of every group (as in PFP), in one scan of the database, the
+    frequent items of a transaction are sorted by rank, and for every group occurring in it the prefix up to its last
+    item of that group is added to the shard of the group, hence a shard contains the projected databases of all the
+    items of its group, and a transaction is sent at most once to each group
+    :return: python list of shards (python dictionaries, transaction IDs (keys), contains list of transactions
+             (value)), aligned with groups
+    """
+    group_of = {item: idx for idx, group in enumerate(groups) for item in group}
+    shards = [dict() for _ in groups]
+    for TID, transaction in transactions.items():
+        t = sorted((item for item in transaction if item in rank), key=lambda x: rank[x])
+        seen_groups = set()
+        for idx in range(len(t) - 1, -1, -1):
+            group = group_of[t[idx]]
+            if group not in seen_groups:
+                seen_groups.add(group)
+                shards[group][TID] = t[:idx + 1]
+    return shards
+
+
+def gen_freq_itemsets_projected_DB(transactions, null_label=None, min_sup=0.5, min_len=1, max_len=None,
+                                   must_contain=None, must_not_contain=None, antecedent_items=None,
+                                   backend="fptree", result="dict", n_jobs=None, n_groups=None, projection="scan",
+                                   memory_budget=None, temp_dir=None):
     """
     Generates frequent itemsets, using projected database method variant of FP-growth
     This function should be used when the dataset is too large that complete FP-tree cannot be put in main memory
     :param transactions: python dictionary, transaction IDs (keys), contains list of transactions(value)
+                         (or a TransactionDB)
     :param null_label: label of root node (generally should be something i.e. a label of any item)
     :param min_sup: minimum support threshold
-    :return: python dictionary of frequent itemsets (key), along with their support counts(value)
+    :param min_len: int, minimum length of the itemsets generated
+    :param max_len: int, maximum length of the itemsets generated, None for no limit
+    :param must_contain: iterable of items, generated itemsets must contain at least one of them
+    :param must_not_contain: iterable of items, generated itemsets must not contain any of them
+    :param antecedent_items: iterable of items, universe of items of the generated itemsets (items of must_contain
+                             are always allowed), i.e. rules generated from them have antecedents from this universe
+    :param backend: "fptree" (FPTree) or "array_fptree" (ArrayFPTree), class of the conditional fp-trees
+    :param result: "dict" or "trie", container of the frequent itemsets returned
+    :param n_jobs: int, number of worker processes (-1 for all CPUs), if greater than 1 the frequent items are split
+                   into groups of balanced estimated projected database sizes, and the group-dependent shard of
+                   transactions of each group is mined in a separate process (Parallel FP-growth), None or 1 for
+                   serial mining, the same itemsets and support counts are returned in either case (the order of
+                   the itemsets may differ)
+    :param n_groups: int, number of item groups (shards) for n_jobs > 1, None for n_jobs groups
+    :param projection: "scan" (projected database of every item is constructed by a scan of all the transactions) or
+                       "partition" (database is partitioned into all the item-projected databases in a single scan, and
+                       transactions move on from the partition of an item to the next one as items are mined)
+    :param memory_budget: int, maximum size (in bytes) of the partitions kept in memory (for projection="partition",
+                          in each process), larger partitions are spilled to temporary binary files, None for no limit
+    :param temp_dir: directory of the temporary spill files, None for the default temporary directory
+    :return: python dictionary of frequent itemsets (python tuples, items in sorted order) (key), along with their
+             support counts (value), or an ItemsetTrie of the same (for result="trie"), either can be passed to
+             gen_rules (of all frequent itemsets) directly
     """
+    # backend is validated before the database is scanned
+    _private_fptree_class(backend)
+    if projection not in ("scan", "partition"):
+        raise ValueError(f'Unknown projection method : {projection}')
+    _private_check_result(result)
+    must_contain = None if must_contain is None else set(must_contain)
     n = len(transactions)
-    freq_one_itemsets = dict()
     # First scan of the database to get the support counts of individual items
-    for _, t in transactions.items():
-        for item in t:
-            if item in freq_one_itemsets:
-                freq_one_itemsets[item] += 1
-            else:
-                freq_one_itemsets[item] = 1
+    freq_one_itemsets = _private_count_items(transactions)
+    _private_remove_excluded_items(freq_one_itemsets, must_contain, must_not_contain, antecedent_items)
     infrequent_items = []
     for item, sup_count in freq_one_itemsets.items():
         if sup_count < n * min_sup:
@@ -254,43 +928,37 @@ def gen_freq_itemsets_projected_DB(transactions, null_label=None, min_sup=0.5):
         del freq_one_itemsets[item]
 
     # freq_one_itemsets contains (key=item, value=supp_count) pairs, with only frequent items
-
-    frequent_itemsets = []
+    # items in decreasing order of support count (ties are broken by order of their first occurrence), the
+    # item-projected database of an item contains only the items before it
+    rank = {item: idx for idx, item in enumerate(sorted(freq_one_itemsets, key=lambda x: freq_one_itemsets[x],
+                                                        reverse=True))}
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+    if projection == "partition":
+        mine_projected_DBs = _private_mine_partitioned_DBs
+        projection_kwargs = dict(memory_budget=memory_budget, temp_dir=temp_dir)
+    else:
+        mine_projected_DBs = _private_mine_projected_DBs
+        projection_kwargs = dict()
+    if n_jobs is None or n_jobs <= 1:
+        item_itemsets = mine_projected_DBs(transactions, list(freq_one_itemsets), freq_one_itemsets, rank,
+                                           min_sup * n, null_label, backend, min_len, max_len, must_contain,
+                                           **projection_kwargs)
+    else:
+        groups = _private_balanced_item_groups(freq_one_itemsets, rank, n, n_jobs if n_groups is None else n_groups)
+        shards = _private_group_shards(transactions, groups, rank)
+        item_itemsets = dict()
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [executor.submit(mine_projected_DBs, shard, group, freq_one_itemsets, rank,
+                                       min_sup * n, null_label, backend, min_len, max_len, must_contain,
+                                       **projection_kwargs)
+                       for group, shard in zip(groups, shards)]
+            for future in futures:
+                item_itemsets.update(future.result())
+
+    # same itemsets and support counts for any number of jobs, but not necessarily in the same order
+    frequent_itemsets = dict()
     for item in freq_one_itemsets:
-        # construct projected database
-        projected_DB = {TID: [item_ for item_ in transaction
-                              if item_ in freq_one_itemsets
-                              and item_ != item
-                              and freq_one_itemsets[item_] >= freq_one_itemsets[item]]
-                        for TID, transaction in transactions.items() if item in transaction}
-        # Note: If we are assured that transaction width is not too large (bounded above by a constant) then
-        # membership test can be considered O(1)
-
-        projected_DB_freq_items = dict()
-        for _, t in projected_DB.items():
-            for _item in t:
-                if _item in projected_DB_freq_items:
-                    projected_DB_freq_items[_item] += 1
-                else:
-                    projected_DB_freq_items[_item] = 1
-        _infrequent_items = []
-        for _item, sup_count in projected_DB_freq_items.items():
-            if sup_count < n * min_sup:
-                _infrequent_items.append(_item)
-        for _item in _infrequent_items:
-            del projected_DB_freq_items[_item]
-
-        conditional_fp_tree = FPTree(null_label=null_label)
-
-        # Second scan of the database to construct FP-tree
-        for _, transaction in projected_DB.items():
-            # _transaction must be in decreasing order of support count
-            _transaction = [_item for _item in transaction if _item in projected_DB_freq_items]
-            _transaction = sorted(_transaction, key=lambda x: projected_DB_freq_items[x], reverse=True)
-            conditional_fp_tree.insert(_transaction)
-        # collect all the frequent itemsets from item-conditional fp-tree
-        frequent_itemsets.append([item])
-        frequent_itemsets.extend(conditional_fp_tree.gen_freq_itemsets_fp(projected_DB_freq_items,
-                                                                          min_supp_count=min_sup * n,
-                                                                          suffix=[item]))
-    return frequent_itemsets
+        frequent_itemsets.update(item_itemsets[item])
+    return _private_result(frequent_itemsets, result)
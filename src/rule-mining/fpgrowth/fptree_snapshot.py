@@ -0,0 +1,202 @@
+"""
+Persistent FP-Tree Snapshot Implementation using Python.
+FP-tree of a database is built once at the lowest minimum support of interest, saved to a compact binary file (the
+typed arrays of ArrayFPTree), and loaded back by memory-mapping, frequent itemsets at any higher minimum support are
+mined from it without scanning the transactions again
+"""
+
+import json
+import mmap as _mmap
+import struct
+import sys
+from array import array
+from array_fptree import ArrayFPTree, _NIL
+from fp_growth import _private_build_fptree, _private_check_modes, _private_check_result, _private_count_items, \
+    _private_result
+
+_MAGIC = b'FPTSNAP1'
+# magic, number of nodes (with the root), number of items, number of transactions, minimum support count, size of
+# the metadata (json) in bytes
+_HEADER = struct.Struct('<8sqqqdq')
+# typed arrays of the file, in order, every one of them starts at a multiple of 8 bytes
+_NODE_ARRAYS = (('node_count', 'q'), ('node_item', 'i'), ('node_parent', 'i'), ('node_first_child', 'i'),
+                ('node_next_sibling', 'i'), ('node_link', 'i'))
+
+
+def _private_padding(size):
+    return -size % 8
+
+
+class FPTreeSnapshot:
+    """
+    class for FP-tree snapshot of a database, along with the support counts of its items and the minimum support count
+    it was built at, itemsets are mined from it at any minimum support not below that
+    """
+
+    def __init__(self, fptree, item_supp_counts, n_transactions, min_supp_count):
+        """
+        :param fptree: ArrayFPTree of the frequent items of the database (with its item_order)
+        :param item_supp_counts: python dictionary, item (key) and its support count (value) in the database
+        :param n_transactions: int, number of transactions of the database
+        :param min_supp_count: minimum support count the fp-tree was built at
+        """
+        self.fptree = fptree
+        self.item_supp_counts = item_supp_counts
+        self.n_transactions = n_transactions
+        self.min_supp_count = min_supp_count
+        self._mmap = None
+
+    @classmethod
+    def build(cls, transactions, min_sup=0.5, null_label=None):
+        """
+        Builds the fp-tree of transactions (two scans of the database)
+        :param transactions: python dictionary, transaction IDs (keys), contains list of transactions(value)
+                             (or a TransactionDB)
+        :param min_sup: lowest minimum support threshold the snapshot will be mined at
+        :param null_label: label of root node
+        :return: FPTreeSnapshot
+        """
+        n = len(transactions)
+        item_supp_counts = {item: supp_count for item, supp_count in _private_count_items(transactions).items()
+                            if supp_count >= min_sup * n}
+        fptree = _private_build_fptree(transactions, item_supp_counts, ArrayFPTree, null_label)
+        return cls(fptree, item_supp_counts, n, min_sup * n)
+
+    @property
+    def min_sup(self):
+        return self.min_supp_count / self.n_transactions if self.n_transactions else 0
+
+    def save(self, path):
+        """
+        Saves the snapshot to a single binary file, item labels must be json serializable (for ex. int or str)
+        :param path: path of the file
+        :return: None
+        """
+        fptree = self.fptree
+        labels = fptree.labels
+        metadata = json.dumps({'byteorder': sys.byteorder, 'null_label': fptree.null_label, 'labels': labels,
+                               'item_order': [fptree.label_ids[item] for item in fptree.item_order]}).encode()
+        heads = array('i', (fptree.header_table.get(label, _NIL) for label in labels))
+        supp_counts = array('q', (self.item_supp_counts[label] for label in labels))
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, len(fptree.node_item), len(labels), self.n_transactions,
+                                 float(self.min_supp_count), len(metadata)))
+            f.write(metadata)
+            f.write(bytes(_private_padding(_HEADER.size + len(metadata))))
+            # 8-byte arrays first, so that all the arrays stay aligned
+            supp_counts.tofile(f)
+            for name, typecode in _NODE_ARRAYS:
+                array(typecode, getattr(fptree, name)).tofile(f)
+            heads.tofile(f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Loads a snapshot saved by save, the fp-tree can be mined but not modified
+        :param path: path of the file
+        :param mmap: bool, if True the node arrays are memory-mapped (read-only, pages are loaded as they are
+                     accessed), otherwise they are read into memory
+        :return: FPTreeSnapshot
+        """
+        with open(path, 'rb') as f:
+            if mmap:
+                buffer = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+            else:
+                buffer = f.read()
+        magic, n_nodes, n_items, n_transactions, min_supp_count, metadata_size = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC:
+            raise ValueError(f'{path} is not an FP-tree snapshot')
+        offset = _HEADER.size
+        metadata = json.loads(bytes(buffer[offset:offset + metadata_size]))
+        if metadata['byteorder'] != sys.byteorder:
+            raise ValueError(f'{path} was saved on a machine with {metadata["byteorder"]} endian byte order')
+        offset += metadata_size + _private_padding(offset + metadata_size)
+
+        view = memoryview(buffer)
+
+        def read(typecode, length):
+            nonlocal offset
+            size = length * array(typecode).itemsize
+            values = view[offset:offset + size].cast(typecode)
+            offset += size
+            return values
+
+        labels = metadata['labels']
+        fptree = ArrayFPTree(metadata['null_label'], labels, {label: idx for idx, label in enumerate(labels)})
+        supp_counts = read('q', n_items)
+        for name, typecode in _NODE_ARRAYS:
+            setattr(fptree, name, read(typecode, n_nodes))
+        fptree.header_table = {label: head for label, head in zip(labels, read('i', n_items)) if head != _NIL}
+        fptree.item_order = [labels[item_id] for item_id in metadata['item_order']]
+        # no child look-up table, nodes are never inserted into a loaded fp-tree
+        fptree.child_table = None
+        snapshot = cls(fptree, dict(zip(labels, supp_counts)), n_transactions, min_supp_count)
+        snapshot._mmap = buffer if mmap else None
+        return snapshot
+
+    def _min_supp_count(self, min_sup):
+        if min_sup is None:
+            return self.min_supp_count
+        min_supp_count = min_sup * self.n_transactions
+        if min_supp_count < self.min_supp_count:
+            raise ValueError(f'min_sup {min_sup} is below the minimum support {self.min_sup} of the snapshot')
+        return min_supp_count
+
+    def gen_freq_itemsets(self, min_sup=None, top_k=None, closed=False, maximal=False, min_len=1, max_len=None,
+                          must_contain=None, result="dict"):
+        """
+        Generates frequent itemsets from the snapshot, same as fp_growth.gen_freq_itemsets on the database
+        :param min_sup: minimum support threshold (not below that of the snapshot), None for that of the snapshot
+        :param top_k: int, if given only the top_k most frequent itemsets are generated (min_sup is the lower bound of
+                      the threshold)
+        :param closed: bool, if True only the closed frequent itemsets are generated
+        :param maximal: bool, if True only the maximal frequent itemsets are generated
+        :param min_len: int, minimum length of the itemsets generated
+        :param max_len: int, maximum length of the itemsets generated, None for no limit
+        :param must_contain: iterable of items, generated itemsets must contain at least one of them
+        :param result: "dict" or "trie", container of the frequent itemsets returned
+        :return: python dictionary of frequent itemsets (python tuples, items in sorted order) (key), along with their
+                 support counts (value), or an ItemsetTrie of the same (for result="trie")
+        """
+        _private_check_result(result)
+        _private_check_modes(top_k, closed, maximal, min_len, max_len, must_contain)
+        must_contain = None if must_contain is None else set(must_contain)
+        min_supp_count = self._min_supp_count(min_sup)
+        item_order = self.fptree.item_order
+        item_supp_counts = self.item_supp_counts
+        if top_k is not None and len(item_order) >= top_k and min_len <= 1 and must_contain is None:
+            # top_k items are frequent itemsets themselves, hence support count of the top_k-th itemset is at least
+            # that of the top_k-th item
+            min_supp_count = max(min_supp_count, item_supp_counts[item_order[top_k - 1]])
+        # items infrequent at min_supp_count stay in the fp-tree, but are dropped from every conditional fp-tree
+        freq_items = [item for item in item_order if item_supp_counts[item] >= min_supp_count]
+        if closed or maximal:
+            # items are mined from the bottom of the fp-tree, so that supersets are always found before subsets
+            freq_items = freq_items[::-1]
+        freq_itemsets = self.fptree.gen_freq_itemsets_fp(freq_items, min_supp_count=min_supp_count, top_k=top_k,
+                                                         closed=closed, maximal=maximal, min_len=min_len,
+                                                         max_len=max_len, must_contain=must_contain)
+        return _private_result(freq_itemsets, result)
+
+    def iter_freq_itemsets(self, min_sup=None, min_len=1, max_len=None, must_contain=None):
+        """
+        Generates frequent itemsets from the snapshot lazily, same as fp_growth.iter_freq_itemsets on the database
+        :param min_sup: minimum support threshold (not below that of the snapshot), None for that of the snapshot
+        :return: generator of (frequent itemset (python tuple, items in sorted order), supp_count)
+        """
+        must_contain = None if must_contain is None else set(must_contain)
+        min_supp_count = self._min_supp_count(min_sup)
+        freq_items = [item for item in self.fptree.item_order if self.item_supp_counts[item] >= min_supp_count]
+        yield from self.fptree.iter_freq_itemsets_fp(freq_items, min_supp_count=min_supp_count, min_len=min_len,
+                                                     max_len=max_len, must_contain=must_contain)
+
+    def close(self):
+        """
+        Releases the memory-mapped file (the snapshot can not be mined afterwards)
+        """
+        if self._mmap is not None:
+            fptree = self.fptree
+            for name, _ in _NODE_ARRAYS:
+                getattr(fptree, name).release()
+            self._mmap.close()
+            self._mmap = None
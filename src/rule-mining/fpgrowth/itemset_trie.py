@@ -0,0 +1,206 @@
+"""
+Prefix Trie of frequent itemsets (along with their support counts) Implementation using Python.
+Nodes are stored level by level in flat typed arrays, children of every node are contiguous and sorted by item id,
+hence support count of an itemset is looked up with one binary search per item
+"""
+
+from array import array
+from bisect import bisect_left
+
+# support count of a node whose itemset is only a prefix of the stored itemsets, and not stored itself
+_ABSENT = -1
+
+
+class _TrieLevel:
+    """
+    class for read-only view of the k-itemsets of an ItemsetTrie, behaves as a python dictionary
+    {k-itemset (python tuple) : supp_count}
+    """
+
+    def __init__(self, trie, k):
+        self.trie = trie
+        self.k = k
+
+    def _nodes(self):
+        trie = self.trie
+        start = trie.level_offsets[self.k]
+        stop = trie.level_offsets[self.k + 1] if self.k + 1 < len(trie.level_offsets) else len(trie.node_item)
+        return (node for node in range(start, stop) if trie.node_count[node] != _ABSENT)
+
+    def items(self):
+        for node in self._nodes():
+            yield self.trie.itemset(node), self.trie.node_count[node]
+
+    def keys(self):
+        for node in self._nodes():
+            yield self.trie.itemset(node)
+
+    def values(self):
+        for node in self._nodes():
+            yield self.trie.node_count[node]
+
+    def __iter__(self):
+        return self.keys()
+
+    def __len__(self):
+        return self.trie.level_sizes[self.k]
+
+    def __getitem__(self, itemset):
+        if len(itemset) != self.k:
+            raise KeyError(itemset)
+        return self.trie[itemset]
+
+    def __contains__(self, itemset):
+        return len(itemset) == self.k and itemset in self.trie
+
+    def get(self, itemset, default=None):
+        return self[itemset] if itemset in self else default
+
+
+class ItemsetTrie:
+    """
+    class for Prefix Trie of itemsets (along with their support counts)
+    trie[itemset] is the support count of itemset (python tuple, O(len(itemset)) binary searches),
+    trie.level(k) is the view of all the k-itemsets as a python dictionary, and the trie can be used in place of a
+    python list of dictionaries of frequent itemsets (freq_itemsets[k - 1] is level(k)), for ex. in gen_rules
+    """
+
+    def __init__(self, labels, node_item, node_count, node_parent, child_offsets, level_offsets):
+        """
+        Creates the trie from its arrays (see from_itemsets)
+        :param labels: python list, item label of each item id (in increasing order of labels)
+        :param node_item: array, item id of each node (node 0 is the root)
+        :param node_count: array, support count of the itemset of each node (_ABSENT if not stored)
+        :param node_parent: array, parent of each node
+        :param child_offsets: array, children of node v are nodes child_offsets[v] ... child_offsets[v + 1] - 1
+        :param level_offsets: array, first node of each level (itemsets of size k are at level k)
+        """
+        self.labels = labels
+        self.label_ids = {label: idx for idx, label in enumerate(labels)}
+        self.node_item = node_item
+        self.node_count = node_count
+        self.node_parent = node_parent
+        self.child_offsets = child_offsets
+        self.level_offsets = level_offsets
+        # number of stored itemsets of each size
+        self.level_sizes = [0] * len(level_offsets)
+        for k in range(len(level_offsets)):
+            start = level_offsets[k]
+            stop = level_offsets[k + 1] if k + 1 < len(level_offsets) else len(node_item)
+            self.level_sizes[k] = sum(1 for node in range(start, stop) if node_count[node] != _ABSENT)
+
+    @classmethod
+    def from_itemsets(cls, itemsets):
+        """
+        Builds the trie of itemsets
+        :param itemsets: python dictionary, itemset (any python sequence of items) (key) and its support count (value)
+        :return: ItemsetTrie
+        """
+        labels = sorted({item for itemset in itemsets for item in itemset})
+        label_ids = {label: idx for idx, label in enumerate(labels)}
+        encoded = {tuple(sorted(label_ids[item] for item in itemset)): supp_count
+                   for itemset, supp_count in itemsets.items()}
+        max_len = max((len(itemset) for itemset in encoded), default=0)
+
+        node_item = array('i', [-1])
+        node_count = array('q', [_ABSENT])
+        node_parent = array('i', [-1])
+        level_offsets = array('q', [0])
+        # node of each prefix of the previous level
+        prev_nodes = {(): 0}
+        for k in range(1, max_len + 1):
+            level_offsets.append(len(node_item))
+            nodes = dict()
+            # k-prefixes of the itemsets in lexicographic order, hence grouped by their parents in the order of
+            # nodes of the previous level
+            for prefix in sorted({itemset[:k] for itemset in encoded if len(itemset) >= k}):
+                nodes[prefix] = len(node_item)
+                node_item.append(prefix[-1])
+                node_count.append(encoded.get(prefix, _ABSENT))
+                node_parent.append(prev_nodes[prefix[:-1]])
+            prev_nodes = nodes
+        # nodes are in non-decreasing order of their parents, hence children of every node are contiguous
+        n_children = [0] * len(node_item)
+        for node in range(1, len(node_item)):
+            n_children[node_parent[node]] += 1
+        child_offsets = array('q', [1])
+        for node in range(len(node_item)):
+            child_offsets.append(child_offsets[-1] + n_children[node])
+        return cls(labels, node_item, node_count, node_parent, child_offsets, level_offsets)
+
+    def _find(self, itemset):
+        """
+        :return: node of itemset, None if itemset is not a path of the trie
+        """
+        node = 0
+        item_ids = []
+        for item in itemset:
+            item_id = self.label_ids.get(item)
+            if item_id is None:
+                return None
+            item_ids.append(item_id)
+        item_ids.sort()
+        node_item = self.node_item
+        child_offsets = self.child_offsets
+        for item_id in item_ids:
+            start, stop = child_offsets[node], child_offsets[node + 1]
+            idx = bisect_left(node_item, item_id, start, stop)
+            if idx == stop or node_item[idx] != item_id:
+                return None
+            node = idx
+        return node
+
+    def itemset(self, node):
+        """
+        :return: itemset (python tuple of item labels in increasing order) of node
+        """
+        itemset = []
+        while node != 0:
+            itemset.append(self.labels[self.node_item[node]])
+            node = self.node_parent[node]
+        return tuple(reversed(itemset))
+
+    def __getitem__(self, itemset):
+        if isinstance(itemset, int):
+            # freq_itemsets[k - 1] is the view of all the k-itemsets
+            return self.level(itemset + 1)
+        node = self._find(itemset)
+        if node is None or node == 0 or self.node_count[node] == _ABSENT:
+            raise KeyError(itemset)
+        return self.node_count[node]
+
+    def __contains__(self, itemset):
+        node = self._find(itemset)
+        return node is not None and node != 0 and self.node_count[node] != _ABSENT
+
+    def get(self, itemset, default=None):
+        return self[itemset] if itemset in self else default
+
+    def level(self, k):
+        """
+        :return: view of all the k-itemsets of the trie, as a read-only python dictionary
+        """
+        if k < 1 or k >= len(self.level_offsets):
+            raise IndexError(f'No itemsets of size {k} in the trie')
+        return _TrieLevel(self, k)
+
+    def __len__(self):
+        # number of levels, i.e. size of the largest itemset, same as the python list of dictionaries
+        return len(self.level_offsets) - 1
+
+    def __iter__(self):
+        for k in range(1, len(self.level_offsets)):
+            yield self.level(k)
+
+    def items(self):
+        """
+        :return: generator of (itemset, supp_count) of all the itemsets in the trie
+        """
+        for level in self:
+            yield from level.items()
+
+    def n_itemsets(self):
+        """
+        :return: number of itemsets stored in the trie
+        """
+        return sum(self.level_sizes)
@@ -0,0 +1,110 @@
+"""
+Item-partitioned Projected Databases Implementation using Python.
+Transactions (as item ids) are buffered in memory in one flat typed array per item, and when the buffers exceed the
+memory budget the largest ones are spilled (appended) to temporary binary files, a partition is read back (and
+removed) only when its item is mined
+"""
+
+import os
+import tempfile
+from array import array
+
+# size in bytes of an item id in the buffers and spill files
+_ITEM_SIZE = array('i').itemsize
+
+
+class PartitionedDB:
+    """
+    class for Partitioned Database, partition of an item holds transactions (python lists of item ids) added to it,
+    every transaction is stored as its length followed by its item ids, both in memory and on disk
+    """
+
+    def __init__(self, n_items, memory_budget=None, temp_dir=None):
+        """
+        Creates empty partitions of items 0, 1, ..., n_items - 1
+        :param n_items: int, number of items (partitions)
+        :param memory_budget: int, maximum size (in bytes) of the in-memory buffers, None for no limit (nothing is
+                              spilled to disk)
+        :param temp_dir: directory of the temporary spill files, None for the default temporary directory
+        """
+        self.memory_budget = memory_budget
+        self.temp_dir = temp_dir
+        self.buffers = [array('i') for _ in range(n_items)]
+        # number of item ids (and lengths) in all the buffers
+        self.buffered = 0
+        # items whose partitions have been spilled to disk (at least once)
+        self.spilled = set()
+        self.n_spills = 0
+        self._directory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Removes all the spill files
+        """
+        if self._directory is not None:
+            self._directory.cleanup()
+            self._directory = None
+        self.spilled.clear()
+
+    def _path(self, item):
+        if self._directory is None:
+            self._directory = tempfile.TemporaryDirectory(prefix='fpgrowth-', dir=self.temp_dir)
+        return os.path.join(self._directory.name, f'{item}.bin')
+
+    def _spill(self, item):
+        buffer = self.buffers[item]
+        with open(self._path(item), 'ab') as f:
+            buffer.tofile(f)
+        self.buffered -= len(buffer)
+        self.buffers[item] = array('i')
+        self.spilled.add(item)
+        self.n_spills += 1
+
+    def add(self, item, transaction):
+        """
+        Appends transaction to the partition of item
+        :param item: int, item id
+        :param transaction: python list of item ids
+        :return: None
+        """
+        buffer = self.buffers[item]
+        buffer.append(len(transaction))
+        buffer.extend(transaction)
+        self.buffered += len(transaction) + 1
+        if self.memory_budget is not None and self.buffered * _ITEM_SIZE > self.memory_budget:
+            # largest buffers are spilled until half of the budget is free, so that spills are not too frequent
+            for _item in sorted(range(len(self.buffers)), key=lambda x: len(self.buffers[x]), reverse=True):
+                if self.buffered * _ITEM_SIZE <= self.memory_budget // 2:
+                    break
+                self._spill(_item)
+
+    def pop(self, item):
+        """
+        Removes the partition of item
+        :param item: int, item id
+        :return: python list of transactions (python lists of item ids) of the partition, spilled ones first
+        """
+        data = array('i')
+        if item in self.spilled:
+            path = self._path(item)
+            with open(path, 'rb') as f:
+                data.frombytes(f.read())
+            os.remove(path)
+            self.spilled.discard(item)
+        buffer = self.buffers[item]
+        data.extend(buffer)
+        self.buffered -= len(buffer)
+        self.buffers[item] = array('i')
+        transactions = []
+        idx = 0
+        while idx < len(data):
+            length = data[idx]
+            transactions.append(data[idx + 1:idx + 1 + length].tolist())
+            idx += 1 + length
+        return transactions
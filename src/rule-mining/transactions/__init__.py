@@ -0,0 +1,2 @@
+from transaction_db import TransactionDB
+from encoding import ItemEncoder, mine_encoded
@@ -0,0 +1,119 @@
+"""
+Frequency-ranked Item Encoding, item labels (any hashable, for ex. str SKUs) are mapped to dense integer ids in
+decreasing order of support count (id 0 is the most frequent item), infrequent items are dropped while encoding,
+and the frequent itemsets (or rules) mined from the encoded transactions are decoded back to labels
+"""
+
+import numpy as np
+from transaction_db import TransactionDB
+
+
+class ItemEncoder:
+    """
+    Class for Item Encoder, item id of a label is its rank in decreasing order of support count (ties are broken by
+    order of first occurrence), hence an encoded transaction sorted by item id is sorted by decreasing support count
+    """
+
+    def __init__(self, labels, supp_counts):
+        """
+        :param labels: python list, item label of each item id
+        :param supp_counts: python list, support count of each item id (non-increasing)
+        """
+        self.labels = labels
+        self.supp_counts = supp_counts
+        self.label_ids = {label: item_id for item_id, label in enumerate(labels)}
+
+    @classmethod
+    def fit(cls, transactions, min_sup=0.0):
+        """
+        Creates the encoder of the frequent items of transactions (a single scan)
+        :param transactions: python dictionary with TID as key and transactions as value (or a TransactionDB)
+        :param min_sup: float, items with lower support are not encoded (dropped from the encoded transactions)
+        :return: ItemEncoder
+        """
+        n = len(transactions)
+        item_supp_counts = dict()
+        for _, t in transactions.items():
+            for item in t:
+                if item in item_supp_counts:
+                    item_supp_counts[item] += 1
+                else:
+                    item_supp_counts[item] = 1
+        labels = sorted((item for item, supp_count in item_supp_counts.items() if supp_count >= n * min_sup),
+                        key=lambda x: item_supp_counts[x], reverse=True)
+        return cls(labels, [item_supp_counts[label] for label in labels])
+
+    def __len__(self):
+        return len(self.labels)
+
+    def encode(self, transactions):
+        """
+        Encodes transactions, items without an id are dropped, every transaction is sorted by item id
+        :param transactions: python dictionary with TID as key and transactions as value (or a TransactionDB)
+        :return: TransactionDB of item ids (rank_encoded), TIDs are 1, 2, ..., n in the order of transactions
+        """
+        label_ids = self.label_ids
+        lengths = np.zeros((len(transactions) + 1,), dtype=np.int64)
+        item_ids = []
+        for j, (_, t) in enumerate(transactions.items()):
+            _t = sorted({label_ids[item] for item in t if item in label_ids})
+            item_ids.extend(_t)
+            lengths[j + 1] = len(_t)
+        return TransactionDB(np.array(item_ids, dtype=np.int32), np.cumsum(lengths), rank_encoded=True)
+
+    def decode_itemset(self, itemset):
+        """
+        :return: python tuple of item labels (in sorted order) of itemset of item ids
+        """
+        return tuple(sorted(self.labels[item_id] for item_id in itemset))
+
+    def decode(self, freq_itemsets):
+        """
+        Decodes frequent itemsets mined from the encoded transactions
+        :param freq_itemsets: python dictionary {itemset : supp_count} (fpgrowth) or python list of such dictionaries
+                              by size (apriori, eclat) or any other sequence of them (for ex. ItemsetTrie)
+        :return: python dictionary for a python dictionary, python list of dictionaries otherwise
+        """
+        if isinstance(freq_itemsets, dict):
+            return {self.decode_itemset(itemset): supp_count for itemset, supp_count in freq_itemsets.items()}
+        return [{self.decode_itemset(itemset): supp_count for itemset, supp_count in k_itemsets.items()}
+                for k_itemsets in freq_itemsets]
+
+    def decode_rules(self, rules):
+        """
+        Decodes rules (output of gen_rules) generated from the frequent itemsets of the encoded transactions
+        :return: python list of rules, with antecedents and consequents of item labels
+        """
+        return [type(rule)(self.decode_itemset(rule.antecedent), self.decode_itemset(rule.consequent),
+                           rule.confidence) for rule in rules]
+
+
+def mine_encoded(miner, transactions, min_sup=0.5, **miner_kwargs):
+    """
+    Mines frequent itemsets of transactions with dense item ids, items are encoded in decreasing order of support
+    count (infrequent items are dropped), miner runs on the encoded TransactionDB, and its output is decoded
+        Parameters
+        -----------
+        miner : function
+          Frequent itemset miner, called as `miner(encoded_transactions, min_sup=min_sup, **miner_kwargs)`, any of
+          apriori's gen_freq_itemsets, gen_freq_itemsets_tid, eclat's gen_freq_itemsets or fpgrowth's
+          gen_freq_itemsets, gen_freq_itemsets_projected_DB
+
+        transactions : python dictionary with TID as key and transactions as value (or a TransactionDB)
+          Set of all transactions in the data-set, items can be any hashable labels
+
+        min_sup : float (default: 0.5)
+          A float between 0 and 1 for minimum support of the item-sets returned.
+
+        miner_kwargs :
+          Additional keyword arguments for the miner (for ex. max_len, backend)
+
+        Returns
+        -----------
+        (freq_itemsets, encoder)
+        freq_itemsets : output of the miner, with itemsets of item labels (python dictionary for a python dictionary,
+                        python list of dictionaries otherwise)
+        encoder : ItemEncoder, for ex. to decode rules generated from the encoded itemsets
+    """
+    encoder = ItemEncoder.fit(transactions, min_sup)
+    return encoder.decode(miner(encoder.encode(transactions), min_sup=min_sup, **miner_kwargs)), encoder
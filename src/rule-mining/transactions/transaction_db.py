@@ -0,0 +1,184 @@
+"""
+Compact (CSR layout) Transaction Database, with streaming loader of transaction files in FIMI format
+"""
+
+import os
+import itertools
+import numpy as np
+
+
+class TransactionDB:
+    """
+    Class for Transaction Database
+    items of all the transactions are stored in a flat int32 array, transaction i (0-indexed) is
+    item_array[offsets[i]:offsets[i + 1]] (sorted, without duplicates)
+
+    Behaves as a read-only python dictionary with TID (1, 2, ..., n) as key and transaction (python list) as value,
+    hence can be passed directly as `transactions` to any of the miners
+    """
+
+    def __init__(self, item_array, offsets, rank_encoded=False):
+        """
+        Initialize a transaction database from its CSR arrays
+        :param item_array: numpy array (int32), items of all the transactions, one after the other
+        :param offsets: numpy array (int64) of size n + 1, offsets of each transaction in item_array
+        :param rank_encoded: bool, True if items are dense ids in decreasing order of support count (see
+                             encoding.ItemEncoder), hence every transaction is already in that order
+        """
+        self.item_array = item_array
+        self.offsets = offsets
+        self.rank_encoded = rank_encoded
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        """
+        Creates a transaction database from a python dictionary with TID as key and transactions as value
+        """
+        lengths = np.zeros((len(transactions) + 1,), dtype=np.int64)
+        item_array = np.zeros((sum(len(t) for t in transactions.values()),), dtype=np.int32)
+        i = 0
+        for j, t in enumerate(transactions.values()):
+            _t = sorted(set(t))
+            item_array[i:i + len(_t)] = _t
+            i += len(_t)
+            lengths[j + 1] = len(_t)
+        return cls(item_array[:i].copy(), np.cumsum(lengths))
+
+    @classmethod
+    def from_fimi(cls, path, chunk_size=1 << 16, cache=False):
+        """
+        Loads a transaction file in FIMI format (one transaction per line with space separated integer items),
+        the file is parsed in streaming chunks of lines, empty lines are skipped
+        :param path: str, path of the transaction file
+        :param chunk_size: int, number of lines parsed at once
+        :param cache: bool, if True a binary copy of the database is saved next to the file (path + '.items.npy',
+                      path + '.offsets.npy') on first load, later loads memory-map the binary copy
+        :return: TransactionDB
+        """
+        if cache and _private_is_cached(path):
+            return cls.load(path, mmap=True)
+
+        item_chunks = []
+        length_chunks = [np.zeros((1,), dtype=np.int64)]
+        with open(path) as file:
+            while True:
+                lines = list(itertools.islice(file, chunk_size))
+                if not lines:
+                    break
+                item_chunk, lengths = _private_parse_lines(lines)
+                item_chunks.append(item_chunk)
+                length_chunks.append(lengths)
+        item_array = np.concatenate(item_chunks) if item_chunks else np.zeros((0,), dtype=np.int32)
+        db = cls(item_array, np.cumsum(np.concatenate(length_chunks)))
+        if cache:
+            db.save(path)
+            return cls.load(path, mmap=True)
+        return db
+
+    def save(self, path):
+        """
+        Saves the database as binary files path + '.items.npy', path + '.offsets.npy'
+        """
+        # offsets are written last, so that a binary copy interrupted while saving is never newer than the file as a
+        # whole
+        np.save(path + '.items.npy', self.item_array)
+        np.save(path + '.offsets.npy', self.offsets)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Loads a database saved with TransactionDB.save, memory-mapped (read-only) if mmap is True
+        """
+        mmap_mode = 'r' if mmap else None
+        return cls(np.load(path + '.items.npy', mmap_mode=mmap_mode),
+                   np.load(path + '.offsets.npy', mmap_mode=mmap_mode))
+
+    def iter_chunks(self, chunk_size):
+        """
+        Returns generator of TransactionDBs (views, no copy) of at most chunk_size consecutive transactions each
+        """
+        n = len(self)
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            yield TransactionDB(self.item_array, self.offsets[start:stop + 1], self.rank_encoded)
+
+    def transaction(self, idx):
+        """
+        Returns transaction at index idx (0-indexed) as numpy array (view)
+        """
+        return self.item_array[self.offsets[idx]:self.offsets[idx + 1]]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, tid):
+        if tid < 1 or tid > len(self):
+            raise KeyError(tid)
+        return self.transaction(tid - 1).tolist()
+
+    def __contains__(self, tid):
+        return isinstance(tid, int) and 1 <= tid <= len(self)
+
+    def __iter__(self):
+        return iter(range(1, len(self) + 1))
+
+    def keys(self):
+        return range(1, len(self) + 1)
+
+    def values(self, block_size=1 << 16):
+        for _, t in self.items(block_size):
+            yield t
+
+    def items(self, block_size=1 << 16):
+        """
+        Returns generator of (TID, transaction as python list), items are converted to python ints block by block
+        """
+        n = len(self)
+        offsets = self.offsets
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            base = int(offsets[start])
+            block_offsets = (offsets[start:stop + 1] - base).tolist()
+            block = self.item_array[base:int(offsets[stop])].tolist()
+            for i in range(stop - start):
+                yield start + i + 1, block[block_offsets[i]:block_offsets[i + 1]]
+
+    def __str__(self):
+        return f'TransactionDB(transactions : {len(self)}, item occurrences : {len(self.item_array)})'
+
+
+def _private_is_cached(path):
+    """
+    Returns True if both the binary files of the database saved next to path exist, and are not older than path
+    """
+    mtime = os.path.getmtime(path)
+    for suffix in ('.items.npy', '.offsets.npy'):
+        if not os.path.exists(path + suffix) or os.path.getmtime(path + suffix) < mtime:
+            return False
+    return True
+
+
+def _private_parse_lines(lines):
+    """
+    Parses lines of a FIMI file into CSR arrays (items of each transaction are sorted and de-duplicated)
+    :param lines: python list of str
+    :return: (numpy array of items (int32), numpy array of lengths of the transactions (int64))
+    """
+    tokens = []
+    lengths = []
+    for line in lines:
+        line_tokens = line.split()
+        if line_tokens:
+            tokens.extend(line_tokens)
+            lengths.append(len(line_tokens))
+    items = np.array(tokens, dtype=np.int64).astype(np.int32)
+    lengths = np.array(lengths, dtype=np.int64)
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    # sort items within each transaction and drop duplicates
+    order = np.lexsort((items, rows))
+    items = items[order]
+    keep = np.ones((len(items),), dtype=bool)
+    keep[1:] = (items[1:] != items[:-1]) | (rows[1:] != rows[:-1])
+    items = items[keep]
+    lengths = np.bincount(rows[keep], minlength=len(lengths)).astype(np.int64)
+    return items, lengths